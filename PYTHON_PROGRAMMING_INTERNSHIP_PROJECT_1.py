@@ -1,32 +1,400 @@
+import gzip
+import hashlib
+import itertools
+import math
+import mmap
+import multiprocessing
+import os
 import random
+import stat
 import string
+import struct
+import sys
+import tempfile
+import time
 
 class UsernameGenerator:
-    def __init__(self):
+    def __init__(self, taken=None):
         self.adjectives = ["Happy", "Cool", "Brave", "Clever", "Swift", "Mighty", "Epic"]
         self.nouns = ["Tiger", "Dragon", "Panda", "Eagle", "Wolf", "Phoenix", "Warrior"]
+        self.special_chars = "!#$%&*"
+        # Optional TakenNamesIndex; generated names are checked against it and added to it
+        self.taken = taken
         
-    def generate_username(self, include_numbers=True, include_special=True, max_number=999):
+    def generate_username(self, include_numbers=True, include_special=True, max_number=999, max_attempts=1000):
+        if self.taken is None:
+            return self._random_username(include_numbers, include_special, max_number)
+        
+        for _ in range(max_attempts):
+            username = self._random_username(include_numbers, include_special, max_number)
+            if self.taken.add(username):
+                return username
+        raise ValueError(f"No free username found in {max_attempts} attempts.")
+    
+    def _random_username(self, include_numbers, include_special, max_number):
         username = f"{random.choice(self.adjectives)}{random.choice(self.nouns)}"
         
         if include_numbers:
             username += str(random.randint(1, max_number))
             
         if include_special:
-            special_chars = "!#$%&*"
-            username += random.choice(special_chars)
+            username += random.choice(self.special_chars)
             
         return username
     
-    def save_usernames(self, usernames, filename="usernames.txt"):
+    def generate_many(self, count, include_numbers=True, include_special=True, max_number=999,
+                      unique=True, seed=None):
+        """Generates a batch of usernames in one pass.
+
+        Every username is an index into the adjective x noun x number x special
+        space, so the batch is drawn as a list of indices and decoded afterwards.
+        With unique=True the indices are sampled without replacement, which makes
+        the batch collision-free. Passing a seed makes the batch reproducible.
+        When a taken-names index is attached the batch is drawn through
+        iter_usernames instead, which keeps drawing until enough free names
+        are found.
+        """
+        if self.taken is not None:
+            return list(self.iter_usernames(count, include_numbers, include_special, max_number, unique, seed))
+        
+        rng = random.Random(seed)
+        prefixes, specials, number_count, space = self._name_space(include_numbers, include_special, max_number)
+        
+        if unique:
+            if count > space:
+                raise ValueError(f"Only {space} unique usernames are possible with these settings.")
+            indices = rng.sample(range(space), count)
+        else:
+            indices = rng.choices(range(space), k=count)
+        
+        return self._decode_indices(indices, prefixes, specials, include_numbers, number_count)
+    
+    def _name_space(self, include_numbers, include_special, max_number):
+        """Returns the building blocks of the username space and its size."""
+        prefixes = [adjective + noun for adjective in self.adjectives for noun in self.nouns]
+        specials = list(self.special_chars) if include_special else [""]
+        number_count = max_number if include_numbers else 1
+        space = len(prefixes) * number_count * len(specials)
+        return prefixes, specials, number_count, space
+    
+    def _decode_indices(self, indices, prefixes, specials, include_numbers, number_count):
+        """Maps name-space indices back onto username strings."""
+        special_count = len(specials)
+        tail = number_count * special_count
+        
+        if not include_numbers:
+            return [prefixes[index // special_count] + specials[index % special_count] for index in indices]
+        
+        usernames = []
+        append = usernames.append
+        for index in indices:
+            prefix, rest = divmod(index, tail)
+            number, special = divmod(rest, special_count)
+            append(f"{prefixes[prefix]}{number + 1}{specials[special]}")
+        return usernames
+    
+    def iter_usernames(self, count, include_numbers=True, include_special=True, max_number=999,
+                       unique=True, seed=None, chunk_size=65536):
+        """Yields count usernames without holding the batch in memory.
+
+        Names are decoded chunk_size at a time. With unique=True the positions
+        0..count-1 are pushed through a seeded permutation of the name space
+        instead of being sampled, so uniqueness needs no record of earlier names.
+        Names found in the taken-names index are skipped and the rest are added
+        to it as they are produced.
+        """
+        rng = random.Random(seed)
+        prefixes, specials, number_count, space = self._name_space(include_numbers, include_special, max_number)
+        
+        if unique:
+            if count > space:
+                raise ValueError(f"Only {space} unique usernames are possible with these settings.")
+            permutation = _NameSpacePermutation(space, rng)
+        
+        emitted = 0
+        position = 0
+        while emitted < count:
+            batch = min(chunk_size, count - emitted)
+            if unique:
+                stop = min(position + batch, space)
+                if position == stop:
+                    raise ValueError("Every remaining username in the name space is already taken.")
+                indices = [permutation.index(p) for p in range(position, stop)]
+                position = stop
+            else:
+                indices = rng.choices(range(space), k=batch)
+            usernames = self._decode_indices(indices, prefixes, specials, include_numbers, number_count)
+            
+            if self.taken is not None:
+                usernames = self.taken.claim(usernames)
+                if not usernames and not unique:
+                    raise ValueError(f"No free username found in {batch} attempts.")
+            
+            emitted += len(usernames)
+            yield from usernames
+    
+    def generate_parallel(self, count, include_numbers=True, include_special=True, max_number=999,
+                          unique=True, seed=None, workers=None, chunk_size=65536):
+        """Yields count usernames generated across a pool of worker processes.
+
+        The batch is cut into chunks of chunk_size positions and every chunk is
+        an independent task, so the output depends only on the seed, never on
+        the number of workers. Unique batches give each task a disjoint slice
+        of the same seeded permutation that iter_usernames walks, which keeps
+        names unique across workers without any coordination. Otherwise each
+        task draws from its own RNG seeded from the run seed and its position.
+        Chunks are yielded in order, ready to be passed to save_usernames.
+        Taken names are filtered here in the parent process, and extra chunks
+        are scheduled to make up for any that were skipped.
+        """
+        prefixes, specials, number_count, space = self._name_space(include_numbers, include_special, max_number)
+        if unique and count > space:
+            raise ValueError(f"Only {space} unique usernames are possible with these settings.")
+        if seed is None:
+            seed = random.getrandbits(64)
+        settings = (self.adjectives, self.nouns, self.special_chars,
+                    include_numbers, include_special, max_number, unique, seed)
+        
+        emitted = 0
+        position = 0
+        with multiprocessing.Pool(workers) as pool:
+            while emitted < count:
+                end = position + (count - emitted)
+                if unique:
+                    end = min(end, space)
+                    if position == end:
+                        raise ValueError("Every remaining username in the name space is already taken.")
+                tasks = [settings + (start, min(start + chunk_size, end)) for start in range(position, end, chunk_size)]
+                
+                round_emitted = 0
+                for usernames in pool.imap(_generate_chunk, tasks):
+                    if self.taken is not None:
+                        usernames = self.taken.claim(usernames)
+                    round_emitted += len(usernames)
+                    yield from usernames
+                
+                if round_emitted == 0 and not unique:
+                    raise ValueError(f"No free username found in {end - position} attempts.")
+                emitted += round_emitted
+                position = end
+    
+    def save_usernames(self, usernames, filename="usernames.txt", compression=None, chunk_size=65536):
+        """Saves usernames to a file.
+
+        usernames can be any iterable, including the generator returned by
+        iter_usernames. It is consumed chunk_size names at a time and every chunk
+        goes out in a single write, so memory stays flat for any batch size.
+        compression may be None, "gzip" or "zstd". Output goes to a temporary
+        file in the same directory, which replaces filename only once complete
+        and is given the permissions filename had, or those a newly created
+        file would get.
+        """
+        temp_path = None
         try:
-            with open(filename, 'w') as file:
-                for username in usernames:
-                    file.write(username + '\n')
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)),
+                                             prefix=".usernames-", suffix=".tmp")
+            os.close(fd)
+            iterator = iter(usernames)
+            with self._open_output(temp_path, compression) as file:
+                while True:
+                    chunk = list(itertools.islice(iterator, chunk_size))
+                    if not chunk:
+                        break
+                    file.write(("\n".join(chunk) + "\n").encode())
+            # mkstemp creates the file owner-only, and os.replace keeps that mode
+            try:
+                mode = stat.S_IMODE(os.stat(filename).st_mode)
+            except FileNotFoundError:
+                umask = os.umask(0)
+                os.umask(umask)
+                mode = 0o666 & ~umask
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, filename)
             return True
         except Exception as e:
             print(f"Error saving to file: {e}")
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
             return False
+    
+    def _open_output(self, path, compression):
+        """Opens path for binary writing with the requested compression."""
+        if compression is None:
+            return open(path, 'wb', buffering=1 << 20)
+        if compression == "gzip":
+            return gzip.open(path, 'wb', compresslevel=6)
+        if compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError("zstd output requires the zstandard package: pip install zstandard")
+            return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'))
+        raise ValueError(f"Unknown compression: {compression}")
+
+
+def _generate_chunk(task):
+    """Worker entry point for generate_parallel: decodes one range of positions."""
+    (adjectives, nouns, special_chars, include_numbers, include_special,
+     max_number, unique, seed, start, stop) = task
+    generator = UsernameGenerator()
+    generator.adjectives, generator.nouns, generator.special_chars = adjectives, nouns, special_chars
+    prefixes, specials, number_count, space = generator._name_space(include_numbers, include_special, max_number)
+    
+    if unique:
+        permutation = _NameSpacePermutation(space, random.Random(seed))
+        indices = [permutation.index(position) for position in range(start, stop)]
+    else:
+        indices = random.Random(f"{seed}:{start}").choices(range(space), k=stop - start)
+    return generator._decode_indices(indices, prefixes, specials, include_numbers, number_count)
+
+
+class _NameSpacePermutation:
+    """Seeded bijection on range(space), used to draw unique names lazily.
+
+    A balanced Feistel network permutes the smallest even-bit domain that
+    covers the space; values that land outside it are fed back in (cycle
+    walking) until they fall inside, which keeps the mapping one-to-one.
+    """
+    
+    ROUNDS = 4
+    
+    def __init__(self, space, rng):
+        self.space = space
+        self.half_bits = max(1, ((space - 1).bit_length() + 1) // 2)
+        self.mask = (1 << self.half_bits) - 1
+        self.keys = [rng.getrandbits(64) for _ in range(self.ROUNDS)]
+    
+    def index(self, position):
+        half_bits = self.half_bits
+        mask = self.mask
+        value = position
+        while True:
+            left, right = value >> half_bits, value & mask
+            for key in self.keys:
+                mixed = ((right ^ key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+                left, right = right, left ^ ((mixed >> 29) & mask)
+            value = (left << half_bits) | right
+            if value < self.space:
+                return value
+
+class TakenNamesIndex:
+    """Disk-backed Bloom filter of usernames that are already in use.
+
+    The bit array lives in a memory-mapped file, so opening an index built from
+    tens of millions of names costs nothing up front and only the pages touched
+    by lookups are read. Membership tests can report false positives at roughly
+    the configured error rate (a free name is occasionally skipped) but never
+    false negatives, so a taken name is never handed out again.
+    """
+    
+    MAGIC = b"UNBF"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHQQ")  # magic, version, hash count, bit count, name count
+    
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, version, self.num_hashes, self.num_bits, self.count = self.HEADER.unpack_from(self.map)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.map.close()
+            self.file.close()
+            raise ValueError(f"{path} is not a taken-names index")
+    
+    @classmethod
+    def create(cls, path, capacity, error_rate=0.001):
+        """Creates an empty index sized for capacity names at error_rate."""
+        capacity = max(1, capacity)
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        num_bits = (num_bits + 7) // 8 * 8
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        with open(path, 'wb') as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, num_hashes, num_bits, 0))
+            file.truncate(cls.HEADER.size + num_bits // 8)
+        return cls(path)
+    
+    @classmethod
+    def build(cls, path, name_files, capacity=None, error_rate=0.001):
+        """Creates an index holding every name listed in name_files.
+
+        Files are read one line at a time. Without an explicit capacity the
+        index is sized for twice the names found, leaving room for new ones.
+        """
+        if capacity is None:
+            lines = 0
+            for name_file in name_files:
+                with open(name_file, 'rb') as file:
+                    lines += sum(1 for _ in file)
+            capacity = max(2 * lines, 100000)
+        index = cls.create(path, capacity, error_rate)
+        for name_file in name_files:
+            index.add_file(name_file)
+        index.flush()
+        return index
+    
+    def _positions(self, key):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        num_bits = self.num_bits
+        return [(first + i * step) % num_bits for i in range(self.num_hashes)]
+    
+    def __contains__(self, name):
+        bits = self.map
+        offset = self.HEADER.size
+        return all(bits[offset + (position >> 3)] & (1 << (position & 7))
+                   for position in self._positions(name.encode()))
+    
+    def add(self, name):
+        """Marks name as taken; returns False if it already was."""
+        return self._add_key(name.encode())
+    
+    def _add_key(self, key):
+        bits = self.map
+        offset = self.HEADER.size
+        added = False
+        for position in self._positions(key):
+            byte = offset + (position >> 3)
+            mask = 1 << (position & 7)
+            value = bits[byte]
+            if not value & mask:
+                bits[byte] = value | mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+    
+    def claim(self, names):
+        """Returns the names that were free, marking each of them as taken."""
+        return [name for name in names if self._add_key(name.encode())]
+    
+    def add_file(self, name_file):
+        """Adds every non-empty line of name_file to the index."""
+        with open(name_file, 'rb') as file:
+            for line in file:
+                key = line.strip()
+                if key:
+                    self._add_key(key)
+    
+    def __len__(self):
+        return self.count
+    
+    def flush(self):
+        self.HEADER.pack_into(self.map, 0, self.MAGIC, self.VERSION, self.num_hashes, self.num_bits, self.count)
+        self.map.flush()
+    
+    def close(self):
+        if not self.map.closed:
+            self.flush()
+            self.map.close()
+        self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
 
 def main():
     generator = UsernameGenerator()
@@ -36,15 +404,19 @@ def main():
     
     try:
         num_usernames = int(input("How many usernames would you like to generate? "))
+        if num_usernames < 1:
+            print("Please enter a positive number")
+            return
         include_numbers = input("Include numbers? (y/n): ").lower() == 'y'
         include_special = input("Include special characters? (y/n): ").lower() == 'y'
         
-        # Generate usernames
-        usernames = []
-        for _ in range(num_usernames):
-            username = generator.generate_username(include_numbers, include_special)
-            usernames.append(username)
-            print(f"Generated username: {username}")
+        # Generate usernames, letting names repeat when too few unique ones exist
+        try:
+            usernames = generator.generate_many(num_usernames, include_numbers, include_special)
+        except ValueError as e:
+            print(f"Warning: {e} Some usernames will repeat.")
+            usernames = generator.generate_many(num_usernames, include_numbers, include_special, unique=False)
+        print("\n".join(f"Generated username: {username}" for username in usernames))
         
         # Save to file
         save_option = input("Would you like to save these usernames to a file? (y/n): ").lower()
@@ -59,5 +431,44 @@ def main():
     except Exception as e:
         print(f"An error occurred: {e}")
 
+def benchmark(count=200000):
+    """Compares the per-call generation loop with the batch API."""
+    generator = UsernameGenerator()
+    
+    start = time.perf_counter()
+    loop_names = [generator.generate_username() for _ in range(count)]
+    loop_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    batch_names = generator.generate_many(count, unique=False, seed=0)
+    batch_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    unique_names = generator.generate_many(count, unique=True, seed=0)
+    unique_time = time.perf_counter() - start
+    
+    print(f"Benchmark ({count} usernames)")
+    print(f"generate_username loop:    {loop_time:.3f}s ({len(set(loop_names))} distinct)")
+    print(f"generate_many unique=False: {batch_time:.3f}s ({len(set(batch_names))} distinct)")
+    print(f"generate_many unique=True:  {unique_time:.3f}s ({len(set(unique_names))} distinct)")
+
+def benchmark_parallel(count=1000000, worker_counts=None):
+    """Reports generate_parallel throughput for 1, 4 and all available workers."""
+    generator = UsernameGenerator()
+    if worker_counts is None:
+        worker_counts = sorted({1, 4, os.cpu_count() or 1})
+    
+    print(f"Parallel benchmark ({count} unique usernames, max_number=999999)")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        generated = sum(1 for _ in generator.generate_parallel(count, max_number=999999, seed=0, workers=workers))
+        elapsed = time.perf_counter() - start
+        print(f"{workers:>3} workers: {elapsed:.3f}s ({generated / elapsed:,.0f} names/s)")
+
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark(*(int(arg) for arg in sys.argv[2:3]))
+    elif len(sys.argv) > 1 and sys.argv[1] == "--benchmark-parallel":
+        benchmark_parallel(*(int(arg) for arg in sys.argv[2:3]))
+    else:
+        main()
@@ -1,3 +1,34 @@
+import argparse
+import codecs
+import glob
+import heapq
+import io
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict, namedtuple
+
+from text_tokens import word_marks
+
+# Size of the blocks read by the streaming counter
+CHUNK_SIZE = 1 << 20
+
+# Files larger than this are counted in byte ranges of this size by the wc command
+SPLIT_SIZE = 32 << 20
+
+# Counts for a piece of text. starts_in_word/ends_in_word record whether the
+# first/last character is part of a word, so that counts of adjacent byte
+# ranges can be merged without counting a straddling word twice.
+TextCounts = namedtuple("TextCounts", ["words", "lines", "bytes", "starts_in_word", "ends_in_word"])
+
+# Result of a frequency analysis: total terms seen, number of distinct terms
+# (estimated in approximate mode) and the most common terms with their counts
+FrequencyReport = namedtuple("FrequencyReport", ["terms", "vocabulary", "top"])
+
 def count_words(text):
     # Handle empty input
     if not text.strip():
@@ -7,6 +38,379 @@ def count_words(text):
     words = text.split()
     return len(words)
 
+def incomplete_tail(chunk):
+    # Return where a UTF-8 sequence cut off by the end of the chunk begins
+    for back in range(1, min(4, len(chunk)) + 1):
+        byte = chunk[-back]
+        if byte < 0x80:
+            break
+        if byte >= 0xC0:
+            length = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            if length > back:
+                return len(chunk) - back
+            break
+    return len(chunk)
+
+def count_stream(stream, chunk_size=CHUNK_SIZE, length=None):
+    # Count words, newlines and bytes in a binary stream of UTF-8 text, one
+    # chunk at a time, reading at most length bytes when it is given. The word
+    # count is the same as count_words on the decoded text, without holding
+    # the text or a list of its words in memory.
+    word_count = 0
+    line_count = 0
+    byte_count = 0
+    starts_in_word = None
+    after_space = True
+    pending = b""
+    
+    while length is None or byte_count < length:
+        size = chunk_size if length is None else min(chunk_size, length - byte_count)
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        byte_count += len(chunk)
+        line_count += chunk.count(b"\n")
+        chunk = pending + chunk
+        
+        # Keep a multi-byte character split by the chunk boundary for the next round
+        cut = incomplete_tail(chunk)
+        chunk, pending = chunk[:cut], chunk[cut:]
+        if not chunk:
+            continue
+        
+        # Whitespace becomes b" " and everything else b"x", so every word start is a b" x" pair
+        marks = word_marks(chunk)
+        if starts_in_word is None:
+            starts_in_word = marks[0] == 0x78
+        
+        # A word that starts at the very beginning of the chunk has no b" x" pair
+        word_count += marks.count(b" x")
+        if after_space and marks[0] == 0x78:
+            word_count += 1
+        after_space = marks[-1] == 0x20
+    
+    # Leftover bytes are an incomplete character, which is never whitespace
+    if pending:
+        if after_space:
+            word_count += 1
+        after_space = False
+        if starts_in_word is None:
+            starts_in_word = True
+    return TextCounts(word_count, line_count, byte_count, bool(starts_in_word), not after_space)
+
+def count_words_in_stream(stream, chunk_size=CHUNK_SIZE):
+    # Count words in a binary stream of UTF-8 text of any size
+    return count_stream(stream, chunk_size).words
+
+def count_words_in_file(path, chunk_size=CHUNK_SIZE):
+    # Count words in a file ("-" means standard input) of any size
+    if path == "-":
+        return count_words_in_stream(sys.stdin.buffer, chunk_size)
+    with open(path, "rb") as file:
+        return count_words_in_stream(file, chunk_size)
+
+def char_boundary(file, offset):
+    # Move offset forward past UTF-8 continuation bytes so no range starts mid-character
+    file.seek(offset)
+    for byte in file.read(3):
+        if byte & 0xC0 != 0x80:
+            break
+        offset += 1
+    return offset
+
+def file_ranges(path, split_size=SPLIT_SIZE):
+    # Split a file into (start, end) byte ranges of about split_size bytes.
+    # Pipes and other files without a known size are read whole (end is None).
+    if not os.path.isfile(path):
+        return [(0, None)]
+    size = os.path.getsize(path)
+    if size <= split_size:
+        return [(0, size)]
+    with open(path, "rb") as file:
+        cuts = sorted({char_boundary(file, offset) for offset in range(split_size, size, split_size)})
+    bounds = [0] + [cut for cut in cuts if cut < size] + [size]
+    return list(zip(bounds, bounds[1:]))
+
+def count_range(task):
+    # Worker entry point: count one byte range of a file, or return the error opening it
+    path, start, end = task
+    try:
+        with open(path, "rb") as file:
+            file.seek(start)
+            return count_stream(file, length=None if end is None else end - start)
+    except OSError as error:
+        return error
+
+def merge_counts(parts):
+    # Combine the counts of adjacent byte ranges, given in file order. A word
+    # running across a boundary was counted once on each side of it.
+    words = sum(part.words for part in parts)
+    for previous, part in zip(parts, parts[1:]):
+        if previous.ends_in_word and part.starts_in_word:
+            words -= 1
+    return TextCounts(words,
+                      sum(part.lines for part in parts),
+                      sum(part.bytes for part in parts),
+                      parts[0].starts_in_word,
+                      parts[-1].ends_in_word)
+
+def count_paths(paths, jobs=None, split_size=SPLIT_SIZE):
+    # Count every path, spreading whole files and byte ranges of large files
+    # over a process pool (jobs=1 counts serially in this process). Returns
+    # one entry per path, in order: its TextCounts or the OSError it raised.
+    results = [None] * len(paths)
+    tasks = []
+    owners = []
+    for index, path in enumerate(paths):
+        if path == "-":
+            continue
+        try:
+            ranges = file_ranges(path, split_size)
+        except OSError as error:
+            results[index] = error
+            continue
+        for start, end in ranges:
+            tasks.append((path, start, end))
+            owners.append(index)
+    
+    grouped = defaultdict(list)
+    if jobs == 1:
+        for owner, part in zip(owners, map(count_range, tasks)):
+            grouped[owner].append(part)
+    else:
+        workers = jobs or os.cpu_count() or 1
+        chunksize = max(1, min(64, len(tasks) // (workers * 4)))
+        with multiprocessing.Pool(workers) as pool:
+            for owner, part in zip(owners, pool.imap(count_range, tasks, chunksize)):
+                grouped[owner].append(part)
+    
+    for owner, parts in grouped.items():
+        errors = [part for part in parts if isinstance(part, OSError)]
+        results[owner] = errors[0] if errors else merge_counts(parts)
+    
+    # Standard input can only be read once, by this process
+    for index, path in enumerate(paths):
+        if path == "-":
+            results[index] = count_stream(sys.stdin.buffer)
+    return results
+
+def expand_paths(patterns):
+    # Expand glob patterns; a pattern that matches nothing is kept so it gets reported
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else []
+        paths.extend(matches or [pattern])
+    return paths
+
+def iter_word_chunks(stream, chunk_size=CHUNK_SIZE, lowercase=False):
+    # Yield the words of a binary UTF-8 stream as one list per chunk read.
+    # A word cut by a chunk boundary is held back and completed in the next list.
+    decoder = codecs.getincrementaldecoder("utf-8")("surrogateescape")
+    partial = ""
+    while True:
+        data = stream.read(chunk_size)
+        text = decoder.decode(data, final=not data)
+        if lowercase:
+            text = text.lower()
+        text = partial + text
+        words = text.split()
+        partial = words.pop() if data and words and not text[-1].isspace() else ""
+        if words:
+            yield words
+        if not data:
+            break
+
+def iter_term_chunks(stream, ngram=1, chunk_size=CHUNK_SIZE, lowercase=False):
+    # Yield lists of terms: single words, or n-gram tuples of consecutive words
+    # (n-grams that span chunks are produced as well)
+    history = []
+    for words in iter_word_chunks(stream, chunk_size, lowercase):
+        if ngram == 1:
+            yield words
+            continue
+        words = history + words
+        yield list(zip(*(words[i:] for i in range(ngram))))
+        history = words[-(ngram - 1):]
+
+def iter_input_term_chunks(streams, ngram=1, chunk_size=CHUNK_SIZE, lowercase=False):
+    # Yield the term chunks of each stream in turn. Every stream starts a new
+    # n-gram history, so no word or n-gram runs from one input into the next.
+    for stream in streams:
+        yield from iter_term_chunks(stream, ngram, chunk_size, lowercase)
+
+class HeavyHitters:
+    # Bounded-memory frequent-terms summary (Misra-Gries). At most capacity
+    # counters are kept. Each chunk's exact counts are merged in, and when
+    # there are too many counters the (capacity + 1)-th largest count is
+    # subtracted from every counter. The result is a lower bound on each term's
+    # true count that is off by at most self.error.
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = Counter()
+        self.error = 0
+    
+    def update(self, counts):
+        self.counts.update(counts)
+        if len(self.counts) > self.capacity:
+            threshold = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+            self.error += threshold
+            self.counts = Counter({term: count - threshold for term, count in self.counts.items()
+                                   if count > threshold})
+    
+    def top(self, k):
+        return self.counts.most_common(k)
+
+class DistinctCounter:
+    # HyperLogLog estimate of the number of distinct terms, using 2**precision
+    # one-byte registers (about 1.04 / sqrt(2**precision) relative error)
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+    
+    def update(self, terms):
+        precision = self.precision
+        mask = (1 << precision) - 1
+        width = 64 - precision
+        registers = self.registers
+        for term in terms:
+            value = hash(term) & 0xFFFFFFFFFFFFFFFF
+            rank = width - (value >> precision).bit_length() + 1
+            if rank > registers[value & mask]:
+                registers[value & mask] = rank
+    
+    def estimate(self):
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        raw = alpha * size * size / sum(2.0 ** -register for register in self.registers)
+        empty = self.registers.count(0)
+        # Linear counting is more accurate while many registers are still empty
+        if raw <= 2.5 * size and empty:
+            return round(size * math.log(size / empty))
+        return round(raw)
+
+def word_frequencies(streams, top=10, ngram=1, lowercase=False, chunk_size=CHUNK_SIZE):
+    # Exact frequency analysis over a list of binary streams: each chunk is
+    # counted on its own and merged into a single Counter, which holds one
+    # entry per distinct term
+    totals = Counter()
+    terms = 0
+    for chunk in iter_input_term_chunks(streams, ngram, chunk_size, lowercase):
+        terms += len(chunk)
+        totals.update(Counter(chunk))
+    return FrequencyReport(terms, len(totals), totals.most_common(top))
+
+def approximate_frequencies(streams, top=10, ngram=1, lowercase=False, capacity=1000, chunk_size=CHUNK_SIZE):
+    # Frequency analysis in bounded memory for inputs whose vocabulary does not
+    # fit in memory: heavy hitters come from a HeavyHitters summary of the given
+    # capacity (counts are lower bounds) and the vocabulary size is estimated
+    summary = HeavyHitters(max(capacity, top))
+    distinct = DistinctCounter()
+    terms = 0
+    for chunk in iter_input_term_chunks(streams, ngram, chunk_size, lowercase):
+        terms += len(chunk)
+        counts = Counter(chunk)
+        distinct.update(counts)
+        summary.update(counts)
+    return FrequencyReport(terms, distinct.estimate(), summary.top(top))
+
+def print_frequency_report(report, ngram=1):
+    print(f"Terms: {report.terms}")
+    print(f"Vocabulary: {report.vocabulary}")
+    for term, count in report.top:
+        print(f"{count:>12} {term if ngram == 1 else ' '.join(term)}")
+
+def wc_main(argv=None):
+    # Command-line entry point: print wc-style line, word and byte counts
+    parser = argparse.ArgumentParser(description="Count lines, words and bytes in files, like wc.")
+    parser.add_argument("paths", nargs="+", help='files or glob patterns, "-" reads standard input')
+    parser.add_argument("-l", "--lines", action="store_true", help="print the newline counts")
+    parser.add_argument("-w", "--words", action="store_true", help="print the word counts")
+    parser.add_argument("-c", "--bytes", action="store_true", help="print the byte counts")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: one per CPU, 1 counts serially)")
+    parser.add_argument("--split-size", type=int, default=SPLIT_SIZE,
+                        help="count files larger than this many bytes in ranges of this size")
+    parser.add_argument("--top", type=int, default=0,
+                        help="instead of counts, report the TOP most frequent terms across all inputs")
+    parser.add_argument("--ngram", type=int, default=1, help="count sequences of this many words (with --top)")
+    parser.add_argument("--ignore-case", action="store_true", help="lowercase words first (with --top)")
+    parser.add_argument("--approximate", action="store_true",
+                        help="use bounded memory instead of exact counts (with --top)")
+    parser.add_argument("--capacity", type=int, default=10000,
+                        help="terms tracked in approximate mode (with --top)")
+    args = parser.parse_args(argv)
+    
+    if args.top:
+        return frequency_main(expand_paths(args.paths), args)
+    
+    columns = [column for column in ("lines", "words", "bytes") if getattr(args, column)]
+    columns = columns or ["lines", "words", "bytes"]
+    paths = expand_paths(args.paths)
+    results = count_paths(paths, args.jobs, args.split_size)
+    
+    counted = [(path, counts) for path, counts in zip(paths, results) if not isinstance(counts, OSError)]
+    if len(paths) > 1:
+        totals = TextCounts(*(sum(counts[i] for _, counts in counted) for i in range(3)), False, False)
+        counted.append(("total", totals))
+    width = max([len(str(getattr(counts, column))) for _, counts in counted for column in columns] + [1])
+    
+    status = 0
+    for path, counts in zip(paths, results):
+        if isinstance(counts, OSError):
+            print(f"wc: {path}: {counts.strerror}", file=sys.stderr)
+            status = 1
+        else:
+            print(" ".join(f"{getattr(counts, column):>{width}}" for column in columns), path)
+    if len(paths) > 1:
+        print(" ".join(f"{getattr(totals, column):>{width}}" for column in columns), "total")
+    return status
+
+def frequency_main(paths, args):
+    # Print a frequency report over all inputs together
+    streams = []
+    try:
+        for path in paths:
+            try:
+                streams.append(sys.stdin.buffer if path == "-" else open(path, "rb"))
+            except OSError as error:
+                print(f"wc: {path}: {error.strerror}", file=sys.stderr)
+                return 1
+        if args.approximate:
+            report = approximate_frequencies(streams, args.top, args.ngram, args.ignore_case, args.capacity)
+        else:
+            report = word_frequencies(streams, args.top, args.ngram, args.ignore_case)
+    finally:
+        for stream in streams:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+    print_frequency_report(report, args.ngram)
+    return 0
+
+def benchmark_frequencies(token_count=3000000, vocabulary=2000000, top=100, capacity=10000):
+    # Compare exact and approximate frequency analysis on a synthetic Zipf corpus
+    rng = random.Random(0)
+    words = [f"w{rank}" for rank in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    corpus = " ".join(rng.choices(words, weights, k=token_count)).encode()
+    print(f"Frequency benchmark ({token_count} tokens, {vocabulary} word vocabulary, top {top})")
+    
+    results = {}
+    for name, analyse in (("exact", word_frequencies),
+                          ("approximate", lambda streams, top: approximate_frequencies(streams, top, capacity=capacity))):
+        tracemalloc.start()
+        start = time.perf_counter()
+        results[name] = analyse([io.BytesIO(corpus)], top)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:>11}: {elapsed:.2f}s, peak {peak / 2 ** 20:.1f} MiB, vocabulary {results[name].vocabulary}")
+    
+    exact = dict(results["exact"].top)
+    approximate = dict(results["approximate"].top)
+    recall = len(exact.keys() & approximate.keys()) / len(exact)
+    worst = max(abs(exact[term] - count) / exact[term] for term, count in approximate.items() if term in exact)
+    print(f"top-{top} recall {recall:.1%}, worst relative count error {worst:.2%}")
+
 def main():
     print("=" * 50)
     print("WORD COUNTER PROGRAM")
@@ -33,4 +437,10 @@ def main():
             print(f"Your text contains {word_count} words.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark_frequencies(*(int(arg) for arg in sys.argv[2:3]))
+    elif len(sys.argv) > 1:
+        # Command-line mode: wc-style counts for the given files
+        sys.exit(wc_main())
+    else:
+        main()
\ No newline at end of file
@@ -1,38 +1,1098 @@
 import os
+import array
+import bisect
+import calendar
+import contextlib
+import csv
 import datetime
+import hashlib
+import itertools
 import json
-from tabulate import tabulate
-import matplotlib.pyplot as plt
-from collections import defaultdict
+import math
+import mmap
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict, defaultdict
+from collections.abc import MutableSequence
+
+
+def date_to_day(date):
+    """Convert a YYYY-MM-DD string to a day number (proleptic Gregorian ordinal)."""
+    try:
+        return datetime.date.fromisoformat(date).toordinal()
+    except ValueError:
+        # fromisoformat needs zero padding, which older entries may lack
+        return datetime.datetime.strptime(date, "%Y-%m-%d").toordinal()
+
+
+def day_to_date(day):
+    """Convert a day number back to a YYYY-MM-DD string."""
+    return datetime.date.fromordinal(day).isoformat()
+
+
+def tabulate(*args, **kwargs):
+    """Render a table with the tabulate package, imported on first use."""
+    from tabulate import tabulate as render_table
+    return render_table(*args, **kwargs)
+
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def lock_file(file):
+        """Block until this process holds the exclusive lock on an open file."""
+        file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after ten one-second retries; keep waiting
+                pass
+
+    def unlock_file(file):
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def lock_file(file):
+        """Block until this process holds the exclusive lock on an open file."""
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def unlock_file(file):
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class ExpenseSnapshot:
+    """Read-only, memory-mapped columnar snapshot of the expenses.
+
+    The file starts with a magic string and a JSON header describing where each
+    column lives, followed by the columns themselves: ids (int64), dates as day
+    numbers (int32), amounts (float64), category codes (uint8), and the end
+    offset (int64) of each row's description in a UTF-8 blob. Opening a
+    snapshot only reads the header; rows are decoded one at a time on access.
+    """
+
+    MAGIC = b"EXPSNAP1"
+    COLUMNS = [("id", "q"), ("day", "i"), ("amount", "d"), ("category", "B"), ("description_end", "q")]
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(self.MAGIC)] != self.MAGIC:
+            self.map.close()
+            raise ValueError(f"{path} is not an expense snapshot")
+        header_length = int.from_bytes(self.map[8:12], 'little')
+        header = json.loads(self.map[12:12 + header_length])
+        self.count = header["count"]
+        self.categories = header["categories"]
+        self.next_id = header["next_id"]
+        self.offsets = header["columns"]
+
+        view = memoryview(self.map)
+        self.columns = {}
+        for name, code in self.COLUMNS:
+            offset, length = self.offsets[name]
+            self.columns[name] = view[offset:offset + length].cast(code)
+        offset, length = self.offsets["descriptions"]
+        self.descriptions = view[offset:offset + length]
+
+    def __len__(self):
+        return self.count
+
+    def row(self, index):
+        """Decode row index into an expense dict."""
+        columns = self.columns
+        ends = columns["description_end"]
+        start = ends[index - 1] if index else 0
+        return {
+            "date": day_to_date(columns["day"][index]),
+            "amount": columns["amount"][index],
+            "description": str(self.descriptions[start:ends[index]], 'utf-8'),
+            "category": self.categories[columns["category"][index]],
+            "id": columns["id"][index],
+        }
+
+    def close(self):
+        # Views must be released before the map can be closed
+        for column in self.columns.values():
+            column.release()
+        self.descriptions.release()
+        self.columns = {}
+        self.map.close()
+
+    @classmethod
+    def write(cls, path, expenses, next_id):
+        """Write expenses (a list of dicts or an ExpenseList) as a snapshot file."""
+        columns = {name: array.array(code) for name, code in cls.COLUMNS}
+        descriptions = bytearray()
+        categories = []
+        category_codes = {}
+
+        def add_row(expense_id, day, amount, description, category):
+            code = category_codes.get(category)
+            if code is None:
+                if len(categories) == 256:
+                    raise ValueError("A snapshot can hold at most 256 categories")
+                code = category_codes[category] = len(categories)
+                categories.append(category)
+            descriptions.extend(description)
+            columns["id"].append(expense_id)
+            columns["day"].append(day)
+            columns["amount"].append(amount)
+            columns["category"].append(code)
+            columns["description_end"].append(len(descriptions))
+
+        for row in (expenses.raw_rows() if isinstance(expenses, ExpenseList) else expenses):
+            if isinstance(row, tuple):
+                # Row copied from the previous snapshot without building a dict
+                snapshot, index = row
+                source = snapshot.columns
+                ends = source["description_end"]
+                add_row(source["id"][index], source["day"][index], source["amount"][index],
+                        snapshot.descriptions[ends[index - 1] if index else 0:ends[index]],
+                        snapshot.categories[source["category"][index]])
+            else:
+                add_row(row["id"], date_to_day(row["date"]), float(row["amount"]),
+                        row["description"].encode('utf-8'), row["category"])
+
+        # Lay the columns out after the header, each aligned to 8 bytes
+        blobs = [(name, columns[name].tobytes()) for name, _ in cls.COLUMNS]
+        blobs.append(("descriptions", bytes(descriptions)))
+        header = {"count": len(columns["id"]), "categories": categories, "next_id": next_id, "columns": {}}
+        # The header size depends on the offsets it records, so reserve generous room for them
+        position = 12 + len(json.dumps(header)) + 64 * len(blobs)
+        for name, blob in blobs:
+            position = (position + 7) // 8 * 8
+            header["columns"][name] = [position, len(blob)]
+            position += len(blob)
+        header_bytes = json.dumps(header).encode()
+
+        with open(path, 'wb') as file:
+            file.write(cls.MAGIC + len(header_bytes).to_bytes(4, 'little') + header_bytes)
+            for name, blob in blobs:
+                file.seek(header["columns"][name][0])
+                file.write(blob)
+            file.flush()
+            os.fsync(file.fileno())
+
+
+class ExpenseList(MutableSequence):
+    """List of expense dicts whose unchanged rows live in an ExpenseSnapshot.
+
+    Until the list is modified other than by appending, row i is simply row i
+    of the snapshot, so creating the list is free. The first insert, update or
+    delete switches to a list holding a snapshot row number or a dict per
+    expense. Rows from the snapshot are decoded into new dicts on every access,
+    so changes must be made by assigning to the list, not by editing the dicts.
+    The list is kept in ascending id order, which lets position_of() use bisection.
+    """
+
+    def __init__(self, snapshot=None, expenses=()):
+        self.snapshot = snapshot
+        self.rows = None
+        self.appended = list(expenses)
+
+    def _base_length(self):
+        return len(self.snapshot) if self.snapshot is not None else 0
+
+    def _materialize(self):
+        if self.rows is None:
+            self.rows = list(range(self._base_length())) + self.appended
+            self.appended = None
+        return self.rows
+
+    def _decode(self, row):
+        return self.snapshot.row(row) if isinstance(row, int) else row
+
+    def __len__(self):
+        if self.rows is not None:
+            return len(self.rows)
+        return self._base_length() + len(self.appended)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self.rows is not None:
+            return self._decode(self.rows[index])
+        base = self._base_length()
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("expense index out of range")
+        return self.snapshot.row(index) if index < base else self.appended[index - base]
+
+    def __setitem__(self, index, expense):
+        self._materialize()[index] = expense
+
+    def __delitem__(self, index):
+        del self._materialize()[index]
+
+    def insert(self, index, expense):
+        self._materialize().insert(index, expense)
+
+    def append(self, expense):
+        if self.rows is None:
+            self.appended.append(expense)
+        else:
+            self.rows.append(expense)
+
+    def raw_rows(self):
+        """Yield (snapshot, row number) for snapshot rows and the dict for the others."""
+        if self.rows is None:
+            for index in range(self._base_length()):
+                yield self.snapshot, index
+            yield from self.appended
+        else:
+            for row in self.rows:
+                yield (self.snapshot, row) if isinstance(row, int) else row
+
+    def _id_of(self, row):
+        return self.snapshot.columns["id"][row] if isinstance(row, int) else row["id"]
+
+    def position_of(self, expense_id):
+        """Return the position of the expense with the given id, or None."""
+        if self.rows is not None:
+            rows = self.rows
+            position = bisect.bisect_left(rows, expense_id, key=self._id_of)
+            if position < len(rows) and self._id_of(rows[position]) == expense_id:
+                return position
+            return None
+        # Unmodified: the snapshot's id column is sorted, then the appended rows
+        base = self._base_length()
+        if base:
+            ids = self.snapshot.columns["id"]
+            position = bisect.bisect_left(ids, expense_id)
+            if position < base:
+                return position if ids[position] == expense_id else None
+        appended = self.appended
+        position = bisect.bisect_left(appended, expense_id, key=lambda row: row["id"])
+        if position < len(appended) and appended[position]["id"] == expense_id:
+            return base + position
+        return None
+
+
+class ExpenseLog:
+    """Append-only JSON Lines journal of expense changes on top of a snapshot.
+
+    Each add, edit or delete appends a single record, so the cost of a change
+    does not grow with the number of expenses, and a crash can at worst leave
+    a partial last line, which is dropped on the next load. Every expense
+    carries an "id" so that edits and deletes can name it.
+
+    Compaction writes the current expenses to a new numbered ExpenseSnapshot
+    file and replaces the journal with a single "header" record naming that
+    snapshot (and the next id, so ids of deleted expenses are never reused).
+    Loading maps the snapshot and replays only the records written since.
+    Each compaction uses a fresh snapshot file name and the journal is swapped
+    in atomically, so a crash at any point leaves a journal whose snapshot exists.
+
+    Several processes may share a journal. Writers take an advisory lock on
+    "<journal>.lock" and first catch up by replaying the records appended
+    since they last read it, so ids are never handed out twice and nothing
+    another process wrote is lost. The byte offset read so far serves as the
+    version: a stat() tells whether anything changed, and a different first
+    line means another process compacted and the journal must be reloaded.
+    """
+
+    def __init__(self, path="expenses.jsonl", compact_after=10000, compact_ratio=1.0):
+        """Open the journal at path; see needs_compaction for compact_after and compact_ratio."""
+        self.path = path
+        self.compact_after = compact_after
+        self.compact_ratio = compact_ratio
+        self.next_id = 1
+        self.records = 0
+        self.generation = 0
+        self.snapshot = None
+        self.offset = 0
+        self.first_line = b""
+        self.signature = None
+        self.lock_file = None
+        self.lock_depth = 0
+        self.thread_lock = threading.RLock()
+
+    @staticmethod
+    def _signature(stat):
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    @contextlib.contextmanager
+    def locked(self):
+        """Hold the journal's lock file exclusively; re-entrant within this process."""
+        with self.thread_lock:
+            if not self.lock_depth:
+                self.lock_file = open(self.path + ".lock", 'a+b')
+                try:
+                    lock_file(self.lock_file)
+                except BaseException:
+                    self.lock_file.close()
+                    raise
+            self.lock_depth += 1
+            try:
+                yield
+            finally:
+                self.lock_depth -= 1
+                if not self.lock_depth:
+                    unlock_file(self.lock_file)
+                    self.lock_file.close()
+                    self.lock_file = None
+
+    def is_current(self):
+        """Whether the journal is unchanged since this object last read or wrote it."""
+        try:
+            return self._signature(os.stat(self.path)) == self.signature
+        except FileNotFoundError:
+            return self.signature is None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def snapshot_path(self, generation):
+        return f"{os.path.splitext(self.path)[0]}.{generation}.snapshot"
+
+    def load(self):
+        """Open the snapshot, replay the journal and return the expenses as an ExpenseList."""
+        self.close()
+        self.records = 0
+        self.next_id = 1
+        self.generation = 0
+        self.offset = 0
+        self.first_line = b""
+        self.signature = None
+        if not self.exists():
+            return ExpenseList()
+
+        with open(self.path, 'rb') as file:
+            data = file.read()
+            self.signature = self._signature(os.fstat(file.fileno()))
+        # Only lines followed by a newline can have been written completely
+        lines = data.split(b"\n")[:-1]
+        expenses = ExpenseList()
+        valid_bytes = 0
+        for number, line in enumerate(lines, 1):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if number < len(lines):
+                    raise ValueError(f"{self.path} is corrupt at line {number}")
+                break
+            if record["op"] == "header" and record.get("snapshot") is not None:
+                self.generation = record["snapshot"]
+                self.snapshot = ExpenseSnapshot(self.snapshot_path(self.generation))
+                expenses = ExpenseList(self.snapshot)
+            self.apply(expenses, record)
+            valid_bytes += len(line) + 1
+            self.records += 1
+        # Drop a torn final record left behind by a crash during an append
+        if valid_bytes < len(data):
+            with open(self.path, 'r+b') as file:
+                file.truncate(valid_bytes)
+                self.signature = self._signature(os.fstat(file.fileno()))
+        self.offset = valid_bytes
+        self.first_line = data[:data.find(b"\n") + 1]
+
+        if len(expenses):
+            self.next_id = max(self.next_id, expenses[-1]["id"] + 1)
+        return expenses
+
+    def apply(self, expenses, record):
+        """Apply one journal record to an ExpenseList.
+
+        Returns (removed, added): the expense the record replaced or deleted
+        and the one it stored, each None if there is none.
+        """
+        op = record["op"]
+        if op == "header":
+            self.next_id = max(self.next_id, record["next_id"])
+        elif op == "add":
+            expenses.append(record["expense"])
+            self.next_id = max(self.next_id, record["expense"]["id"] + 1)
+            return None, record["expense"]
+        elif op == "edit":
+            position = expenses.position_of(record["expense"]["id"])
+            if position is not None:
+                removed = expenses[position]
+                expenses[position] = record["expense"]
+                return removed, record["expense"]
+        elif op == "delete":
+            position = expenses.position_of(record["id"])
+            if position is not None:
+                removed = expenses[position]
+                del expenses[position]
+                return removed, None
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+        return None, None
+
+    def catch_up(self, expenses):
+        """Apply the records other processes appended since the journal was last read.
+
+        Call with the lock held. Returns the (removed, added) pairs of the
+        changes, or None if the journal was replaced by another process's
+        compaction and has to be loaded again. A torn final record, left by
+        a writer that crashed mid-append, is cut off here: with the lock
+        held no append can be in progress, and the next append must not
+        land on the end of it.
+        """
+        try:
+            file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return [] if self.signature is None else None
+        with file:
+            first_line = file.readline()
+            if first_line != self.first_line:
+                return None
+            file.seek(self.offset)
+            data = file.read()
+            signature = self._signature(os.fstat(file.fileno()))
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            with open(self.path, 'r+b') as file:
+                file.truncate(self.offset + end)
+                signature = self._signature(os.fstat(file.fileno()))
+        changes = [self.apply(expenses, json.loads(line)) for line in data[:end].splitlines()]
+        self.records += len(changes)
+        self.offset += end
+        self.signature = signature
+        return changes
+
+    def append(self, records):
+        """Durably append journal records with a single write."""
+        data = "".join(json.dumps(record) + "\n" for record in records).encode('utf-8')
+        with open(self.path, 'ab') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+            self.signature = self._signature(os.fstat(file.fileno()))
+        if not self.offset:
+            self.first_line = data[:data.find(b"\n") + 1]
+        self.offset += len(data)
+        self.records += len(records)
+
+    def add(self, expense):
+        """Assign the expense an id and journal it."""
+        expense["id"] = self.next_id
+        self.next_id += 1
+        self.append([{"op": "add", "expense": expense}])
+
+    def add_many(self, expenses):
+        """Assign ids to a batch of expenses and journal them with one write."""
+        for expense in expenses:
+            expense["id"] = self.next_id
+            self.next_id += 1
+        self.append([{"op": "add", "expense": expense} for expense in expenses])
+
+    def edit(self, expense):
+        self.append([{"op": "edit", "expense": expense}])
+
+    def delete(self, expense):
+        self.append([{"op": "delete", "id": expense["id"]}])
+
+    def needs_compaction(self, live_count):
+        """Whether the journal has grown enough to be worth folding into a new snapshot.
+
+        Compaction rewrites all live_count expenses, so it waits until at
+        least compact_after records have been journaled since the snapshot
+        and at least compact_ratio times as many as there are expenses. Each
+        rewrite is then paid for by that many appends, so the cost per change
+        stays the same as the ledger grows, and so does the share of loading
+        spent replaying the journal.
+        """
+        journaled = self.records - bool(self.generation)
+        return journaled >= self.compact_after and journaled >= self.compact_ratio * live_count
+
+    def compact(self, expenses):
+        """Snapshot the given expenses, empty the journal and return the reloaded list.
+
+        Expenses without an id (e.g. from expenses.json) are given one first.
+        """
+        if not isinstance(expenses, ExpenseList):
+            for expense in expenses:
+                if "id" not in expense:
+                    expense["id"] = self.next_id
+                    self.next_id += 1
+            self.next_id = max([self.next_id] + [expense["id"] + 1 for expense in expenses])
+
+        generation = self.generation + 1
+        ExpenseSnapshot.write(self.snapshot_path(generation), expenses, self.next_id)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({"op": "header", "next_id": self.next_id, "snapshot": generation}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+        # The old snapshot must be unmapped before it can be removed on Windows
+        self.close()
+        os.replace(temp_path, self.path)
+        for name in os.listdir(os.path.dirname(os.path.abspath(self.path))):
+            old = os.path.join(os.path.dirname(self.path), name)
+            if old != self.snapshot_path(generation) and self.is_snapshot_name(name):
+                try:
+                    os.remove(old)
+                except PermissionError:
+                    # Still mapped by another process on Windows; a later compaction removes it
+                    pass
+        return self.load()
+
+    def is_snapshot_name(self, name):
+        prefix = os.path.basename(os.path.splitext(self.path)[0]) + "."
+        middle = name[len(prefix):-len(".snapshot")]
+        return name.startswith(prefix) and name.endswith(".snapshot") and middle.isdigit()
+
+    def close(self):
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+
+class ExpenseColumns:
+    """NumPy column store of the expenses, sorted by (date, id).
+
+    Each expense takes 21 bytes: an int64 id, an int32 day number, a float64
+    amount and a uint8 code into a category dictionary. Because the rows are
+    sorted, a date range is a contiguous slice found with searchsorted, and
+    totals by month or category are computed with vectorised group-bys.
+    Descriptions are not stored; look expenses up by id for those.
+    """
+
+    EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+    def __init__(self, capacity=1024):
+        import numpy as np
+        self.size = 0
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.days = np.empty(capacity, dtype=np.int32)
+        self.amounts = np.empty(capacity, dtype=np.float64)
+        self.codes = np.empty(capacity, dtype=np.uint8)
+        self.categories = []
+        self.category_codes = {}
+
+    def code(self, category):
+        """Return the dictionary code of category, adding it if new."""
+        code = self.category_codes.get(category)
+        if code is None:
+            if len(self.categories) == 256:
+                raise ValueError("The column store can hold at most 256 categories")
+            code = self.category_codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    @classmethod
+    def from_expenses(cls, expenses):
+        """Build the columns from a list of expense dicts or an ExpenseList.
+
+        Rows that still live in the ExpenseList's snapshot are copied straight
+        from its memory-mapped columns without being decoded.
+        """
+        import numpy as np
+        columns = cls(max(len(expenses), 1))
+        count = len(expenses)
+        ids = np.empty(count, dtype=np.int64)
+        days = np.empty(count, dtype=np.int32)
+        amounts = np.empty(count, dtype=np.float64)
+        codes = np.empty(count, dtype=np.uint8)
+
+        snapshot = expenses.snapshot if isinstance(expenses, ExpenseList) else None
+        if snapshot is not None and expenses.rows is None:
+            # Untouched snapshot followed by appended expenses
+            snapshot_positions = np.arange(len(snapshot))
+            snapshot_rows = snapshot_positions
+            others = list(enumerate(expenses.appended, len(snapshot)))
+        else:
+            snapshot_positions, snapshot_rows, others = [], [], []
+            for position, row in enumerate(expenses.raw_rows() if isinstance(expenses, ExpenseList) else expenses):
+                if isinstance(row, tuple):
+                    snapshot_positions.append(position)
+                    snapshot_rows.append(row[1])
+                else:
+                    others.append((position, row))
+
+        if len(snapshot_rows):
+            source = snapshot.columns
+            remap = np.array([columns.code(name) for name in snapshot.categories], dtype=np.uint8)
+            ids[snapshot_positions] = np.frombuffer(source["id"], dtype=np.int64)[snapshot_rows]
+            days[snapshot_positions] = np.frombuffer(source["day"], dtype=np.int32)[snapshot_rows]
+            amounts[snapshot_positions] = np.frombuffer(source["amount"], dtype=np.float64)[snapshot_rows]
+            codes[snapshot_positions] = remap[np.frombuffer(source["category"], dtype=np.uint8)[snapshot_rows]]
+        for position, expense in others:
+            ids[position] = expense["id"]
+            days[position] = date_to_day(expense["date"])
+            amounts[position] = expense["amount"]
+            codes[position] = columns.code(expense["category"])
+
+        order = np.lexsort((ids, days))
+        columns.size = count
+        columns.ids[:count] = ids[order]
+        columns.days[:count] = days[order]
+        columns.amounts[:count] = amounts[order]
+        columns.codes[:count] = codes[order]
+        return columns
+
+    def _arrays(self):
+        return self.ids, self.days, self.amounts, self.codes
+
+    def _position(self, day, expense_id):
+        import numpy as np
+        days = self.days[:self.size]
+        low = int(np.searchsorted(days, day, 'left'))
+        high = int(np.searchsorted(days, day, 'right'))
+        return low + int(np.searchsorted(self.ids[low:high], expense_id))
+
+    def insert(self, expense):
+        """Insert one expense at its sorted position."""
+        import numpy as np
+        if self.size == len(self.ids):
+            for name in ("ids", "days", "amounts", "codes"):
+                grown = np.empty(2 * len(self.ids), dtype=getattr(self, name).dtype)
+                grown[:self.size] = getattr(self, name)[:self.size]
+                setattr(self, name, grown)
+        day = date_to_day(expense["date"])
+        position = self._position(day, expense["id"])
+        values = (expense["id"], day, expense["amount"], self.code(expense["category"]))
+        for array_, value in zip(self._arrays(), values):
+            array_[position + 1:self.size + 1] = array_[position:self.size]
+            array_[position] = value
+        self.size += 1
+
+    def remove(self, expense):
+        """Remove one expense, located by its date and id."""
+        position = self._position(date_to_day(expense["date"]), expense["id"])
+        for array_ in self._arrays():
+            array_[position:self.size - 1] = array_[position + 1:self.size]
+        self.size -= 1
+
+    def slice_between(self, start_date, end_date):
+        """Return the (start, end) row slice for dates start_date to end_date inclusive."""
+        import numpy as np
+        days = self.days[:self.size]
+        start = int(np.searchsorted(days, date_to_day(start_date), 'left'))
+        end = int(np.searchsorted(days, date_to_day(end_date), 'right'))
+        return start, end
+
+    def ids_between(self, start_date, end_date, category=None):
+        """Return the ids dated start_date to end_date inclusive, optionally in one category."""
+        start, end = self.slice_between(start_date, end_date)
+        if category is None:
+            return self.ids[start:end].tolist()
+        if category not in self.category_codes:
+            return []
+        return self.ids[start:end][self.codes[start:end] == self.category_codes[category]].tolist()
+
+    def category_totals(self, start=0, end=None):
+        """Return ({category: total}, {category: count}) for a row slice."""
+        import numpy as np
+        end = self.size if end is None else end
+        codes = self.codes[start:end]
+        totals = np.bincount(codes, weights=self.amounts[start:end], minlength=len(self.categories))
+        counts = np.bincount(codes, minlength=len(self.categories))
+        present = np.nonzero(counts)[0].tolist()
+        return ({self.categories[code]: float(totals[code]) for code in present},
+                {self.categories[code]: int(counts[code]) for code in present})
+
+    def month_category_totals(self):
+        """Return {YYYY-MM: ({category: total}, {category: count})} for every month."""
+        import numpy as np
+        size = self.size
+        months = (self.days[:size] - self.EPOCH).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        keys = months * 256 + self.codes[:size]
+        groups, inverse = np.unique(keys, return_inverse=True)
+        totals = np.bincount(inverse, weights=self.amounts[:size])
+        counts = np.bincount(inverse)
+        result = defaultdict(lambda: ({}, {}))
+        for key, total, count in zip(groups.tolist(), totals.tolist(), counts.tolist()):
+            month, code = divmod(key, 256)
+            year_month = f"{1970 + month // 12:04d}-{month % 12 + 1:02d}"
+            result[year_month][0][self.categories[code]] = total
+            result[year_month][1][self.categories[code]] = count
+        return dict(result)
+
+    @property
+    def nbytes(self):
+        return sum(array_[:self.size].nbytes for array_ in self._arrays())
+
+
+class ExpenseIndex:
+    """Aggregates and a date-sorted index over the expenses, updated in place.
+
+    Totals and counts are kept per month and category and per category for all
+    time, so a monthly summary or category analysis only reads the categories
+    involved. Dates are indexed by an ExpenseColumns store when NumPy is
+    installed; the aggregates are then built from it with vectorised
+    group-bys instead of a pass over every expense. Without NumPy a sorted
+    list of (date, id) keys is used. Either way a date range is found by
+    bisection.
+    """
+
+    def __init__(self, expenses=()):
+        self.month_totals = defaultdict(lambda: defaultdict(float))
+        self.month_counts = defaultdict(Counter)
+        self.category_totals = defaultdict(float)
+        self.category_counts = Counter()
+        try:
+            self.columns = ExpenseColumns.from_expenses(expenses)
+        except ImportError:
+            self.columns = None
+
+        if self.columns is None:
+            self.keys = sorted((expense["date"], expense["id"]) for expense in expenses)
+            for expense in expenses:
+                self._count(expense, 1)
+        else:
+            for month, (totals, counts) in self.columns.month_category_totals().items():
+                self.month_totals[month].update(totals)
+                self.month_counts[month].update(counts)
+            totals, counts = self.columns.category_totals()
+            self.category_totals.update(totals)
+            self.category_counts.update(counts)
+
+    def _count(self, expense, sign):
+        month = expense["date"][:7]
+        category = expense["category"]
+        self.month_totals[month][category] += sign * expense["amount"]
+        self.month_counts[month][category] += sign
+        self.category_totals[category] += sign * expense["amount"]
+        self.category_counts[category] += sign
+        # Forget groups that became empty so they are not reported as $0.00
+        if not self.month_counts[month][category]:
+            del self.month_totals[month][category], self.month_counts[month][category]
+            if not self.month_counts[month]:
+                del self.month_totals[month], self.month_counts[month]
+        if not self.category_counts[category]:
+            del self.category_totals[category], self.category_counts[category]
+
+    def add(self, expense):
+        if self.columns is not None:
+            self.columns.insert(expense)
+        else:
+            bisect.insort(self.keys, (expense["date"], expense["id"]))
+        self._count(expense, 1)
+
+    def remove(self, expense):
+        if self.columns is not None:
+            self.columns.remove(expense)
+        else:
+            del self.keys[bisect.bisect_left(self.keys, (expense["date"], expense["id"]))]
+        self._count(expense, -1)
+
+    def month_summary(self, year_month):
+        """Return (total, transaction count, category totals) for a YYYY-MM month."""
+        category_totals = dict(self.month_totals.get(year_month, {}))
+        count = sum(self.month_counts.get(year_month, Counter()).values())
+        return sum(category_totals.values()), count, category_totals
+
+    def ids_between(self, start_date, end_date):
+        """Return the ids of the expenses dated start_date to end_date inclusive, in date order."""
+        if self.columns is not None:
+            return self.columns.ids_between(start_date, end_date)
+        start = bisect.bisect_left(self.keys, (start_date,))
+        end = bisect.bisect_right(self.keys, (end_date, math.inf))
+        return [expense_id for _, expense_id in self.keys[start:end]]
+
+
+def undecodable(text):
+    """Return an error message if text holds bytes that were not valid UTF-8, else None.
+
+    The files are decoded with errors='surrogateescape', which turns each
+    invalid byte into a lone surrogate; those are the characters that do
+    not encode back to UTF-8.
+    """
+    if text.isascii():
+        return None
+    try:
+        text.encode('utf-8')
+    except UnicodeEncodeError as e:
+        return f"not valid UTF-8 (byte 0x{ord(text[e.start]) - 0xDC00:02x}); save the file as UTF-8"
+    return None
+
+
+def printable(text):
+    """Return text with undecodable bytes shown as U+FFFD, so it can go in the errors file."""
+    return text.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
+
+
+def read_expense_rows(path):
+    """Yield (line number, row dict, error) for each record of a CSV or JSON Lines file.
+
+    Files ending in .jsonl or .json are read as one JSON object per line;
+    anything else as CSV with a header row. Header names are matched case-
+    insensitively. error is None unless the line could not be parsed or is
+    not valid UTF-8 (bank exports are often cp1252); such a row is given
+    with the invalid bytes replaced.
+    """
+    if path.lower().endswith((".jsonl", ".json")):
+        with open(path, 'r', encoding='utf-8', errors='surrogateescape') as file:
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                error = undecodable(line)
+                if error is not None:
+                    yield line_number, {"line": printable(line.rstrip("\n"))}, error
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_number, {"line": line.rstrip("\n")}, f"invalid JSON: {e}"
+                    continue
+                if not isinstance(row, dict):
+                    yield line_number, {"line": line.rstrip("\n")}, "expected a JSON object"
+                    continue
+                yield line_number, {str(key).strip().lower(): value for key, value in row.items()}, None
+    else:
+        with open(path, 'r', encoding='utf-8-sig', errors='surrogateescape', newline='') as file:
+            reader = csv.reader(file)
+            header = [printable(name).strip().lower() for name in next(reader, [])]
+            for row in reader:
+                if row:
+                    error = undecodable("".join(row))
+                    if error is not None:
+                        row = [printable(value) for value in row]
+                    yield reader.line_num, dict(zip(header, row)), error
+
+
+EXPENSE_TABLE_COLUMNS = [("#", 7, ">"), ("Date", 10, "<"), ("Category", 14, "<"),
+                         ("Amount", 12, ">"), ("Description", 40, "<")]
+
+
+def expense_table_border():
+    return "+" + "+".join("-" * (width + 2) for _, width, _ in EXPENSE_TABLE_COLUMNS) + "+"
+
+
+def expense_table_header():
+    return "| " + " | ".join(f"{name:^{width}}" for name, width, _ in EXPENSE_TABLE_COLUMNS) + " |"
+
+
+def format_expense_row(number, expense):
+    """Format one expense as a fixed-width table row, cutting long text to fit."""
+    values = [str(number), expense["date"], expense["category"], f"${expense['amount']:.2f}", expense["description"]]
+    cells = []
+    for value, (_, width, align) in zip(values, EXPENSE_TABLE_COLUMNS):
+        if len(value) > width:
+            value = value[:width - 3] + "..."
+        cells.append(f"{value:{align}{width}}")
+    return "| " + " | ".join(cells) + " |"
+
+
+def write_expense_table(rows, stream=None, chunk_rows=1000):
+    """Write (number, expense) pairs as a fixed-width table.
+
+    Lines are produced as rows arrive and written chunk_rows at a time, so
+    arbitrarily long listings start immediately and use constant memory.
+    """
+    stream = stream or sys.stdout
+    border = expense_table_border()
+    stream.write(f"{border}\n{expense_table_header()}\n{border}\n")
+    lines = []
+    for number, expense in rows:
+        lines.append(format_expense_row(number, expense))
+        if len(lines) >= chunk_rows:
+            stream.write("\n".join(lines) + "\n")
+            lines = []
+    lines.append(border)
+    stream.write("\n".join(lines) + "\n")
+
+
+class ChartRenderer:
+    """Render category pie charts to image files, caching them on disk.
+
+    Charts are drawn with matplotlib's Agg backend on a Figure owned by the
+    renderer, so nothing opens a window or blocks, and pyplot's global state
+    is never touched. The one figure is cleared and reused for every chart.
+    A chart is stored under a hash of its period and (category, total) pairs,
+    so asking again for unchanged data returns the existing file without
+    importing matplotlib at all. Writing a chart deletes the period's older
+    ones, so the cache holds one file per period and format.
+    """
+
+    def __init__(self, cache_dir="charts", image_format="png"):
+        self.cache_dir = cache_dir
+        self.image_format = image_format
+        self.figure = None
+
+    def chart_path(self, category_totals, period):
+        items = sorted(((category, round(amount, 2)) for category, amount in category_totals.items()),
+                       key=lambda item: (-item[1], item[0]))
+        digest = hashlib.sha256(json.dumps([period, items]).encode('utf-8')).hexdigest()[:20]
+        name = "".join(c if c.isalnum() or c == "-" else "_" for c in period)
+        return os.path.join(self.cache_dir, f"{name}-{digest}.{self.image_format}"), items
+
+    def render(self, category_totals, period):
+        """Return the path of the pie chart for category_totals, drawing it if it is not cached."""
+        path, items = self.chart_path(category_totals, period)
+        if os.path.exists(path):
+            return path
+        
+        if self.figure is None:
+            # Imported here: matplotlib takes longer to import than the rest of the program to start
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.figure = Figure(figsize=(10, 7))
+            FigureCanvasAgg(self.figure)
+        
+        self.figure.clear()
+        axes = self.figure.add_subplot()
+        axes.pie([amount for _, amount in items], labels=[category for category, _ in items],
+                 autopct='%1.1f%%', startangle=90)
+        axes.axis('equal')
+        axes.set_title(f'Expenses by Category for {period}')
+        self.figure.tight_layout()
+        
+        # Written under a temporary name so an interrupted render is never mistaken for a cached chart
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=f".{self.image_format}.tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                self.figure.savefig(f, format=self.image_format)
+            # mkstemp makes the file owner-only; give it the mode open() would have
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.remove_stale(path)
+        return path
+
+    def remove_stale(self, path):
+        """Delete the cached charts of path's period and format other than path itself."""
+        directory, current = os.path.split(path)
+        name = current.rsplit("-", 1)[0]
+        pattern = re.compile(rf"{re.escape(name)}-[0-9a-f]{{20}}\.{re.escape(self.image_format)}")
+        for entry in os.listdir(directory):
+            if entry != current and pattern.fullmatch(entry):
+                try:
+                    os.unlink(os.path.join(directory, entry))
+                except OSError:
+                    # Already removed by another renderer, or held open by a viewer
+                    pass
+
+    def render_months(self, month_totals):
+        """Render a chart for every {YYYY-MM: {category: total}} entry; returns {YYYY-MM: path}."""
+        return {year_month: self.render(category_totals, year_month)
+                for year_month, category_totals in sorted(month_totals.items()) if category_totals}
+
+
+def open_file(path):
+    """Open a file in the desktop's default viewer without waiting for it."""
+    if sys.platform == "win32":
+        os.startfile(path)
+    else:
+        subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", path],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
 
 class ExpenseTracker:
-    def __init__(self):
-        """Initialize the Expense Tracker application."""
-        self.expenses = []
+    def __init__(self, ledger="expenses", directory="."):
+        """Initialize the Expense Tracker application on the named ledger."""
+        self.expenses = ExpenseList()
         self.categories = ["Food", "Transportation", "Entertainment", "Housing", "Utilities", "Shopping", "Health", "Education", "Other"]
-        self.data_file = "expenses.json"
+        self.data_file = os.path.join(directory, f"{ledger}.json")
+        self.log = ExpenseLog(os.path.join(directory, f"{ledger}.jsonl"))
+        self._index = None
+        self.charts = ChartRenderer()
         self.load_expenses()
     
+    @property
+    def index(self):
+        """ExpenseIndex over the expenses, built on first use and then kept current."""
+        if self._index is None:
+            self._index = ExpenseIndex(self.expenses)
+        return self._index
+    
     def load_expenses(self):
-        """Load expenses from the JSON file if available."""
+        """Load expenses from the journal, migrating the JSON file on first run."""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as file:
-                    self.expenses = json.load(file)
-                print("Expenses loaded successfully!")
+            with self.log.locked():
+                if not self.log.exists() and os.path.exists(self.data_file):
+                    with open(self.data_file, 'r') as file:
+                        self.expenses = self.log.compact(json.load(file))
+                    print(f"Migrated {self.data_file} to {self.log.path}.")
+                elif self.log.exists():
+                    self.expenses = self.log.load()
+                    print("Expenses loaded successfully!")
         except Exception as e:
             print(f"Error loading expenses: {e}")
-            self.expenses = []
+            self.expenses = ExpenseList()
+        self._index = None
+
+    def refresh(self):
+        """Catch up with changes other processes have journaled to this ledger.
+
+        Costs a single stat() when nothing has changed.
+        """
+        if self.log.is_current():
+            return
+        with self.log.locked():
+            changes = self.log.catch_up(self.expenses)
+            if changes is None:
+                self.expenses = self.log.load()
+                self._index = None
+            elif self._index is not None:
+                for removed, added in changes:
+                    if removed is not None:
+                        self._index.remove(removed)
+                    if added is not None:
+                        self._index.add(added)
 
     def save_expenses(self):
-        """Save expenses to the JSON file."""
+        """Rewrite the journal as a compact copy of all expenses."""
         try:
-            with open(self.data_file, 'w') as file:
-                json.dump(self.expenses, file, indent=4)
+            with self.log.locked():
+                self.refresh()
+                self.expenses = self.log.compact(self.expenses)
             print("Expenses saved successfully!")
         except Exception as e:
             print(f"Error saving expenses: {e}")
 
+    def record_change(self, op, expense, previous=None):
+        """Journal a single add, edit or delete and apply it to the expenses.
+
+        For an edit, expense is the new version and previous the one it
+        replaces. The change is made under the ledger lock after catching up
+        with other processes. An edit or delete is refused if the stored
+        expense no longer matches previous (for a delete, the expense itself)
+        because another process changed or deleted it meanwhile. Returns
+        whether the change was saved.
+        """
+        try:
+            with self.log.locked():
+                self.refresh()
+                if op != "add":
+                    position = self.expenses.position_of(expense["id"])
+                    if position is None or self.expenses[position] != (previous if op == "edit" else expense):
+                        print("This expense was changed by another session; nothing was saved.")
+                        return False
+                getattr(self.log, op)(expense)
+                if op == "add":
+                    self.expenses.append(expense)
+                elif op == "edit":
+                    self.expenses[position] = expense
+                else:
+                    del self.expenses[position]
+                if self.log.needs_compaction(len(self.expenses)):
+                    self.expenses = self.log.compact(self.expenses)
+        except Exception as e:
+            print(f"Error saving expenses: {e}")
+            return False
+        print("Expenses saved successfully!")
+        
+        if self._index is not None:
+            if op == "add":
+                self._index.add(expense)
+            elif op == "edit":
+                self._index.remove(previous)
+                self._index.add(expense)
+            else:
+                self._index.remove(expense)
+        return True
+
     def add_expense(self):
         """Add a new expense."""
         print("\n=== Add New Expense ===")
@@ -44,9 +1104,8 @@ class ExpenseTracker:
                 date = datetime.datetime.now().strftime("%Y-%m-%d")
                 break
             try:
-                # Validate date format
-                datetime.datetime.strptime(date_input, "%Y-%m-%d")
-                date = date_input
+                # Validate date format (stored zero-padded so month prefixes match)
+                date = datetime.datetime.strptime(date_input, "%Y-%m-%d").strftime("%Y-%m-%d")
                 break
             except ValueError:
                 print("Invalid date format. Please use YYYY-MM-DD.")
@@ -91,30 +1150,110 @@ class ExpenseTracker:
             "category": category
         }
         
-        self.expenses.append(expense)
-        self.save_expenses()
-        print("Expense added successfully!")
+        if self.record_change("add", expense):
+            print("Expense added successfully!")
+
+    def matching_positions(self, start_date=None, end_date=None, category=None):
+        """Find the expenses that pass the given filters.
+
+        Returns (positions, total): an iterator over their 0-based positions in
+        self.expenses and their number, or None when that is only known after
+        a full scan. Unfiltered expenses come in list order; filtered ones in
+        date order, looked up through the index.
+        """
+        if start_date is None and end_date is None and category is None:
+            return iter(range(len(self.expenses))), len(self.expenses)
+
+        start_date = start_date or "0001-01-01"
+        end_date = end_date or "9999-12-31"
+        if self.index.columns is not None:
+            ids = self.index.columns.ids_between(start_date, end_date, category)
+            return (self.expenses.position_of(expense_id) for expense_id in ids), len(ids)
+
+        positions = (self.expenses.position_of(expense_id)
+                     for expense_id in self.index.ids_between(start_date, end_date))
+        if category is not None:
+            positions = (position for position in positions if self.expenses[position]["category"] == category)
+        return positions, None
+
+    def show_expenses_page(self, offset=0, limit=20, start_date=None, end_date=None, category=None):
+        """Print up to limit matching expenses starting at offset (limit=None prints all).
+
+        Rows are numbered by their position in the full list, as edit and delete
+        expect. Returns (rows shown, total matches or None if not known).
+        """
+        self.refresh()
+        positions, total = self.matching_positions(start_date, end_date, category)
+        stop = None if limit is None else offset + limit
+        shown = 0
+
+        def rows():
+            nonlocal shown
+            for position in itertools.islice(positions, offset, stop):
+                shown += 1
+                yield position + 1, self.expenses[position]
+
+        write_expense_table(rows())
+        return shown, total
 
     def view_expenses(self):
-        """View all expenses."""
+        """View expenses a page at a time, optionally filtered by date range and category."""
         if not self.expenses:
             print("\nNo expenses found.")
             return
         
-        print("\n=== All Expenses ===")
-        table_data = []
-        
-        for i, expense in enumerate(self.expenses, 1):
-            table_data.append([
-                i,
-                expense["date"],
-                expense["category"],
-                f"${expense['amount']:.2f}",
-                expense["description"]
-            ])
+        page_size = 20
+        offset = 0
+        filters = {}
+        while True:
+            print("\n=== All Expenses ===" if not filters else "\n=== Filtered Expenses ===")
+            shown, total = self.show_expenses_page(offset, page_size, **filters)
+            if total is not None:
+                print(f"Showing {offset + 1 if shown else 0}-{offset + shown} of {total}")
+            has_next = shown == page_size and (total is None or offset + shown < total)
+            
+            choice = input("[n]ext page, [p]revious page, [f]ilter, Enter to continue: ").lower()
+            if choice == 'n' and has_next:
+                offset += page_size
+            elif choice == 'p' and offset:
+                offset = max(0, offset - page_size)
+            elif choice == 'f':
+                filters = self.ask_filters()
+                offset = 0
+            elif not choice:
+                return
+
+    def ask_filters(self):
+        """Prompt for a date range and category to filter the expense list by."""
+        filters = {}
+        for key, prompt in (("start_date", "From date (YYYY-MM-DD, leave empty for no limit): "),
+                            ("end_date", "To date (YYYY-MM-DD, leave empty for no limit): ")):
+            while True:
+                date_input = input(prompt)
+                if not date_input:
+                    break
+                try:
+                    filters[key] = datetime.datetime.strptime(date_input, "%Y-%m-%d").strftime("%Y-%m-%d")
+                    break
+                except ValueError:
+                    print("Invalid date format. Please use YYYY-MM-DD.")
         
-        headers = ["#", "Date", "Category", "Amount", "Description"]
-        print(tabulate(table_data, headers=headers, tablefmt="pretty"))
+        print("\nCategories:")
+        for i, category in enumerate(self.categories, 1):
+            print(f"{i}. {category}")
+        while True:
+            category_input = input("Select category number (leave empty for all): ")
+            if not category_input:
+                break
+            try:
+                category_index = int(category_input) - 1
+                if 0 <= category_index < len(self.categories):
+                    filters["category"] = self.categories[category_index]
+                    break
+                print("Invalid category number.")
+            except ValueError:
+                print("Please enter a valid number.")
+        return filters
 
     def delete_expense(self):
         """Delete an expense."""
@@ -135,9 +1274,8 @@ class ExpenseTracker:
                     print(f"Deleting: {expense['date']} - {expense['category']} - ${expense['amount']:.2f} - {expense['description']}")
                     confirm = input("Are you sure? (y/n): ").lower()
                     if confirm == 'y':
-                        self.expenses.pop(index - 1)
-                        self.save_expenses()
-                        print("Expense deleted successfully!")
+                        if self.record_change("delete", expense):
+                            print("Expense deleted successfully!")
                     else:
                         print("Deletion cancelled.")
                     return
@@ -159,29 +1297,22 @@ class ExpenseTracker:
                 year_month = datetime.datetime.now().strftime("%Y-%m")
                 break
             try:
-                datetime.datetime.strptime(year_month, "%Y-%m")
+                year_month = datetime.datetime.strptime(year_month, "%Y-%m").strftime("%Y-%m")
                 break
             except ValueError:
                 print("Invalid format. Please use YYYY-MM.")
         
-        # Filter expenses for the specified month
-        month_expenses = [expense for expense in self.expenses if expense["date"].startswith(year_month)]
+        # Look the month up in the index
+        total_spent, transaction_count, category_totals = self.index.month_summary(year_month)
         
-        if not month_expenses:
+        if not transaction_count:
             print(f"No expenses found for {year_month}.")
             return
         
-        # Calculate statistics
-        total_spent = sum(expense["amount"] for expense in month_expenses)
-        category_totals = defaultdict(float)
-        
-        for expense in month_expenses:
-            category_totals[expense["category"]] += expense["amount"]
-        
         # Display summary
         print(f"\n=== Monthly Summary for {year_month} ===")
         print(f"Total expenses: ${total_spent:.2f}")
-        print(f"Number of transactions: {len(month_expenses)}")
+        print(f"Number of transactions: {transaction_count}")
         
         print("\nCategory breakdown:")
         table_data = []
@@ -200,18 +1331,24 @@ class ExpenseTracker:
     def show_pie_chart(self, category_totals, period):
         """Display a pie chart of expenses by category."""
         try:
-            labels = list(category_totals.keys())
-            sizes = list(category_totals.values())
-            
-            plt.figure(figsize=(10, 7))
-            plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
-            plt.axis('equal')
-            plt.title(f'Expenses by Category for {period}')
-            plt.tight_layout()
-            plt.show()
+            path = self.charts.render(category_totals, period)
         except Exception as e:
             print(f"Error displaying chart: {e}")
             print("You may need to install matplotlib using: pip install matplotlib")
+            return
+        
+        print(f"Chart saved to {path}")
+        try:
+            open_file(path)
+        except OSError as e:
+            print(f"Could not open a viewer: {e}")
+
+    def export_month_charts(self, year=None):
+        """Render the category chart of every month (or every month of one year); returns {YYYY-MM: path}."""
+        self.refresh()
+        month_totals = {year_month: category_totals for year_month, category_totals in self.index.month_totals.items()
+                        if year is None or year_month.startswith(f"{year}-")}
+        return self.charts.render_months(month_totals)
 
     def category_analysis(self):
         """Show analysis of expenses by category."""
@@ -219,12 +1356,8 @@ class ExpenseTracker:
             print("\nNo expenses found.")
             return
         
-        # Calculate statistics
-        category_totals = defaultdict(float)
-        
-        for expense in self.expenses:
-            category_totals[expense["category"]] += expense["amount"]
-        
+        # Category totals are kept up to date by the index
+        category_totals = dict(self.index.category_totals)
         total_spent = sum(category_totals.values())
         
         # Display summary
@@ -244,6 +1377,136 @@ class ExpenseTracker:
         if show_chart == 'y':
             self.show_pie_chart(category_totals, "All Time")
 
+    def import_expenses(self, path, errors_path=None, category_map=None, batch_size=100000):
+        """Import expenses from a CSV or JSON Lines file without prompting.
+
+        Rows need date (YYYY-MM-DD) and amount fields, and may have description
+        and category. Each distinct date string is parsed once. Categories are
+        looked up in category_map (e.g. {"Groceries": "Food"}) and then matched
+        case-insensitively against the tracker's categories; anything else
+        becomes "Other". Rows that fail validation are written to errors_path
+        as JSON Lines with the reason. Valid rows are committed batch_size at
+        a time, each batch with a single journal write. Returns the number of
+        rows imported and rejected.
+
+        If reading the file fails part way, the batches already committed
+        stay in the ledger; the RuntimeError raised says how many there were
+        and at which line the import stopped.
+        """
+        categories = {category.lower(): category for category in self.categories}
+        for source, target in (category_map or {}).items():
+            categories[source.strip().lower()] = target
+        dates = {}
+        imported = rejected = 0
+        batch = []
+        line_number = 0
+        errors_file = open(errors_path, 'w', encoding='utf-8') if errors_path else None
+        try:
+            for line_number, row, error in read_expense_rows(path):
+                expense = None
+                if error is None:
+                    expense, error = self.parse_import_row(row, dates, categories)
+                if error is not None:
+                    rejected += 1
+                    if errors_file:
+                        errors_file.write(json.dumps({"line": line_number, "error": error, "row": row}) + "\n")
+                    continue
+                batch.append(expense)
+                if len(batch) >= batch_size:
+                    self.commit_batch(batch)
+                    imported += len(batch)
+                    batch = []
+            if batch:
+                self.commit_batch(batch)
+                imported += len(batch)
+        except (OSError, ValueError, csv.Error) as e:
+            raise RuntimeError(f"Import of {path} stopped after line {line_number}: {e}. "
+                               f"{imported} expenses were already imported, {rejected} rejected.") from e
+        finally:
+            if errors_file:
+                errors_file.close()
+        with self.log.locked():
+            self.refresh()
+            if self.log.needs_compaction(len(self.expenses)):
+                self.expenses = self.log.compact(self.expenses)
+        return imported, rejected
+
+    def parse_import_row(self, row, dates, categories):
+        """Validate one imported row; returns (expense, None) or (None, error)."""
+        date_text = str(row.get("date", "")).strip()
+        if date_text not in dates:
+            try:
+                dates[date_text] = datetime.datetime.strptime(date_text, "%Y-%m-%d").strftime("%Y-%m-%d")
+            except ValueError:
+                dates[date_text] = None
+        date = dates[date_text]
+        if date is None:
+            return None, f"invalid date {date_text!r}, expected YYYY-MM-DD"
+
+        try:
+            amount = float(str(row.get("amount", "")).replace(",", "").strip())
+        except ValueError:
+            return None, f"invalid amount {row.get('amount')!r}"
+        if amount < 0 or not math.isfinite(amount):
+            return None, f"amount must be a non-negative number, got {amount}"
+
+        category = str(row.get("category") or "").strip()
+        return {
+            "date": date,
+            "amount": amount,
+            "description": str(row.get("description") or "").strip(),
+            "category": categories.get(category.lower(), "Other"),
+        }, None
+
+    def commit_batch(self, expenses):
+        """Append a batch of new expenses with one journal write."""
+        with self.log.locked():
+            self.refresh()
+            self.log.add_many(expenses)
+            for expense in expenses:
+                self.expenses.append(expense)
+        # Rebuilt on the next query, which is cheaper than a sorted insert per row
+        self._index = None
+
+    def expenses_between(self, start_date, end_date):
+        """Return the expenses dated start_date to end_date (YYYY-MM-DD, inclusive)."""
+        self.refresh()
+        return [self.expenses[self.expenses.position_of(expense_id)]
+                for expense_id in self.index.ids_between(start_date, end_date)]
+
+    def check_indexes(self):
+        """Compare the index against full scans of the expenses.
+
+        Returns a list of the differences found; an empty list means the index
+        is consistent.
+        """
+        self.refresh()
+        problems = []
+        month_totals = defaultdict(lambda: defaultdict(float))
+        month_counts = Counter()
+        category_totals = defaultdict(float)
+        for expense in self.expenses:
+            month_totals[expense["date"][:7]][expense["category"]] += expense["amount"]
+            month_counts[expense["date"][:7]] += 1
+            category_totals[expense["category"]] += expense["amount"]
+
+        def compare(label, expected, actual):
+            for key in expected.keys() | actual.keys():
+                if not math.isclose(expected.get(key, 0), actual.get(key, 0), rel_tol=1e-9, abs_tol=1e-6):
+                    problems.append(f"{label} {key}: expected {expected.get(key, 0)}, found {actual.get(key, 0)}")
+
+        for month in month_totals.keys() | self.index.month_totals.keys():
+            total, count, categories = self.index.month_summary(month)
+            if count != month_counts[month]:
+                problems.append(f"month {month}: expected {month_counts[month]} expenses, found {count}")
+            compare(f"month {month} category", month_totals[month], categories)
+        compare("category", category_totals, self.index.category_totals)
+
+        expected = sorted(self.expenses, key=lambda expense: (expense["date"], expense["id"]))
+        if self.index.ids_between("0001-01-01", "9999-12-31") != [expense["id"] for expense in expected]:
+            problems.append("date index does not list the expenses in date order")
+        return problems
+
     def edit_expense(self):
         """Edit an existing expense."""
         self.view_expenses()
@@ -269,8 +1532,7 @@ class ExpenseTracker:
                             date = expense['date']
                             break
                         try:
-                            datetime.datetime.strptime(date_input, "%Y-%m-%d")
-                            date = date_input
+                            date = datetime.datetime.strptime(date_input, "%Y-%m-%d").strftime("%Y-%m-%d")
                             break
                         except ValueError:
                             print("Invalid date format. Please use YYYY-MM-DD.")
@@ -312,15 +1574,16 @@ class ExpenseTracker:
                             print("Please enter a valid number.")
                     
                     # Update expense
-                    self.expenses[index - 1] = {
+                    updated = {
+                        "id": expense["id"],
                         "date": date,
                         "amount": amount,
                         "description": description,
                         "category": category
                     }
                     
-                    self.save_expenses()
-                    print("Expense updated successfully!")
+                    if self.record_change("edit", updated, previous=expense):
+                        print("Expense updated successfully!")
                     return
                 else:
                     print("Invalid number.")
@@ -340,6 +1603,7 @@ class ExpenseTracker:
             print("0. Exit")
             
             choice = input("\nEnter your choice: ")
+            self.refresh()
             
             if choice == '1':
                 self.add_expense()
@@ -360,7 +1624,308 @@ class ExpenseTracker:
                 print("Invalid choice. Please try again.")
 
 
+_open_ledgers = OrderedDict()
+_open_ledgers_lock = threading.Lock()
+
+
+def open_ledger(name="expenses", directory=".", max_open=64):
+    """Return the process-wide ExpenseTracker for a named ledger.
+
+    Trackers are cached by path, so every caller in the process shares one
+    loaded copy of each ledger and its index, kept current by refresh().
+    At most max_open ledgers are kept; the least recently opened is dropped
+    from the cache first.
+    """
+    path = os.path.abspath(os.path.join(directory, f"{name}.jsonl"))
+    with _open_ledgers_lock:
+        tracker = _open_ledgers.get(path)
+        if tracker is not None:
+            _open_ledgers.move_to_end(path)
+    if tracker is None:
+        tracker = ExpenseTracker(name, directory)
+        with _open_ledgers_lock:
+            tracker = _open_ledgers.setdefault(path, tracker)
+            _open_ledgers.move_to_end(path)
+            while len(_open_ledgers) > max_open:
+                _open_ledgers.popitem(last=False)
+    tracker.refresh()
+    return tracker
+
+
+def synthetic_expenses(count, seed=0):
+    """Generate count random expenses in id order, for benchmarks."""
+    rng = random.Random(seed)
+    categories = ["Food", "Transportation", "Entertainment", "Housing", "Utilities", "Shopping", "Health", "Education", "Other"]
+    first_day = datetime.date(2015, 1, 1).toordinal()
+    return [{
+        "date": day_to_date(first_day + rng.randrange(3650)),
+        "amount": round(rng.uniform(1, 200), 2),
+        "description": f"Expense {i}",
+        "category": rng.choice(categories),
+        "id": i,
+    } for i in range(1, count + 1)]
+
+
+def benchmark_startup(sizes=(10000, 100000, 1000000)):
+    """Time program start-up with the legacy JSON file and with the snapshot.
+
+    Each measurement runs in a fresh interpreter so module imports are counted.
+    The legacy case imports tabulate and matplotlib up front and json.loads the
+    whole file, as the tracker used to.
+    """
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    module_name = os.path.splitext(os.path.basename(__file__))[0]
+    legacy = ("import json\nfrom tabulate import tabulate\nimport matplotlib.pyplot\n"
+              "with open('expenses.json') as file:\n    json.load(file)")
+    current = f"import {module_name}\n{module_name}.ExpenseTracker()"
+
+    def time_run(code, directory):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], cwd=directory, capture_output=True,
+                                env=dict(os.environ, PYTHONPATH=module_dir))
+        elapsed = time.perf_counter() - start
+        return f"{elapsed:8.3f}s" if result.returncode == 0 else "  failed"
+
+    print(f"{'Records':>10} {'legacy':>9} {'snapshot':>9}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            expenses = synthetic_expenses(size)
+            with open(os.path.join(directory, "expenses.json"), 'w') as file:
+                json.dump(expenses, file, indent=4)
+            legacy_time = time_run(legacy, directory)
+            log = ExpenseLog(os.path.join(directory, "expenses.jsonl"))
+            log.compact(expenses)
+            log.close()
+            print(f"{size:>10} {legacy_time} {time_run(current, directory)}")
+
+
+def benchmark_summaries(size=1000000, year_month="2020-06"):
+    """Compare full-scan summaries over a list of dicts with the columnar index."""
+    tracemalloc.start()
+    expenses = synthetic_expenses(size)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    def timed(function):
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+
+    def scan_month():
+        category_totals = defaultdict(float)
+        for expense in [expense for expense in expenses if expense["date"].startswith(year_month)]:
+            category_totals[expense["category"]] += expense["amount"]
+
+    def scan_categories():
+        category_totals = defaultdict(float)
+        for expense in expenses:
+            category_totals[expense["category"]] += expense["amount"]
+
+    last_day = calendar.monthrange(int(year_month[:4]), int(year_month[5:]))[1]
+    month_range = (f"{year_month}-01", f"{year_month}-{last_day:02d}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        log = ExpenseLog(os.path.join(directory, "expenses.jsonl"))
+        loaded = log.compact(expenses)
+        start = time.perf_counter()
+        index = ExpenseIndex(loaded)
+        build_time = time.perf_counter() - start
+        columns = index.columns
+        print(f"Summary benchmark ({size} expenses)")
+        print(f"memory per expense: dicts {dict_bytes / size:.0f} B, columns {columns.nbytes / size:.0f} B")
+        print(f"index build from snapshot: {build_time:.3f}s")
+        print(f"monthly summary:   scan {timed(scan_month):.4f}s, index {timed(lambda: index.month_summary(year_month)):.6f}s, "
+              f"columns {timed(lambda: columns.category_totals(*columns.slice_between(*month_range))):.6f}s")
+        print(f"category analysis: scan {timed(scan_categories):.4f}s, index {timed(lambda: dict(index.category_totals)):.6f}s, "
+              f"columns {timed(columns.category_totals):.6f}s")
+        log.close()
+
+
+def benchmark_import(size=200000, bad_every=100):
+    """Measure bulk CSV import throughput in rows per second."""
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "statement.csv")
+        with open(csv_path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["Date", "Amount", "Description", "Category"])
+            for i, expense in enumerate(synthetic_expenses(size), 1):
+                date = "not a date" if i % bad_every == 0 else expense["date"]
+                writer.writerow([date, expense["amount"], expense["description"], expense["category"]])
+
+        current_directory = os.getcwd()
+        os.chdir(directory)
+        try:
+            tracker = ExpenseTracker()
+            start = time.perf_counter()
+            imported, rejected = tracker.import_expenses(csv_path, os.path.join(directory, "rejected.jsonl"))
+            elapsed = time.perf_counter() - start
+            tracker.log.close()
+        finally:
+            os.chdir(current_directory)
+    print(f"Imported {imported} rows ({rejected} rejected) in {elapsed:.2f}s: {size / elapsed:,.0f} rows/s")
+
+
+def benchmark_charts(size=200000, months=120):
+    """Compare per-chart pyplot rendering with ChartRenderer, cold and cached."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    index = ExpenseIndex(synthetic_expenses(size))
+    month_totals = dict(sorted(index.month_totals.items())[:months])
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        for year_month, category_totals in month_totals.items():
+            # What show_pie_chart used to do for each chart, saving instead of showing
+            plt.figure(figsize=(10, 7))
+            plt.pie(list(category_totals.values()), labels=list(category_totals.keys()), autopct='%1.1f%%', startangle=90)
+            plt.axis('equal')
+            plt.title(f'Expenses by Category for {year_month}')
+            plt.tight_layout()
+            plt.savefig(os.path.join(directory, f"pyplot-{year_month}.png"))
+            plt.close()
+        pyplot_time = time.perf_counter() - start
+
+        renderer = ChartRenderer(os.path.join(directory, "charts"))
+        start = time.perf_counter()
+        renderer.render_months(month_totals)
+        cold_time = time.perf_counter() - start
+        start = time.perf_counter()
+        renderer.render_months(month_totals)
+        cached_time = time.perf_counter() - start
+
+    count = len(month_totals)
+    print(f"{count} monthly charts:")
+    print(f"  new pyplot figure per chart: {pyplot_time:.2f}s ({pyplot_time / count * 1000:.1f} ms/chart)")
+    print(f"  reused Agg figure:           {cold_time:.2f}s ({cold_time / count * 1000:.1f} ms/chart)")
+    print(f"  cached:                      {cached_time:.4f}s ({cached_time / count * 1000:.2f} ms/chart)")
+
+
+def _contention_worker(task):
+    """Mixed reads and writes against a shared ledger, for benchmark_contention."""
+    directory, seed, operations, read_ratio, compact_after = task
+    sys.stdout = open(os.devnull, 'w')
+    rng = random.Random(seed)
+    tracker = open_ledger("contention", directory)
+    tracker.log.compact_after = compact_after
+    # Compact every compact_after writes whatever the ledger size, so that
+    # workers keep having to reload after another worker's compaction
+    tracker.log.compact_ratio = 0
+    read_times, write_times = [], []
+    added = conflicts = 0
+    for _ in range(operations):
+        start = time.perf_counter()
+        if rng.random() < read_ratio:
+            tracker.refresh()
+            tracker.index.month_summary(f"{rng.randrange(2015, 2025)}-{rng.randrange(1, 13):02d}")
+            read_times.append(time.perf_counter() - start)
+            continue
+        if rng.random() < 0.7:
+            expense = {"date": day_to_date(datetime.date(2020, 1, 1).toordinal() + rng.randrange(366)),
+                       "amount": round(rng.uniform(1, 200), 2), "description": f"Worker {seed}", "category": "Other"}
+            added += tracker.record_change("add", expense)
+        else:
+            tracker.refresh()
+            previous = tracker.expenses[rng.randrange(len(tracker.expenses))]
+            updated = dict(previous, amount=round(previous["amount"] + 1, 2))
+            conflicts += not tracker.record_change("edit", updated, previous=previous)
+        write_times.append(time.perf_counter() - start)
+    return read_times, write_times, added, conflicts
+
+
+def benchmark_contention(size=100000, operations=400, read_ratio=0.8, compact_after=500, process_counts=(1, 4)):
+    """Measure reads and writes by several processes sharing one ledger.
+
+    Afterwards the ledger is checked for lost updates, duplicate ids and
+    index drift.
+    """
+    import multiprocessing
+
+    def percentile(times, fraction):
+        times = sorted(times)
+        return times[min(len(times) - 1, int(len(times) * fraction))] * 1000 if times else 0.0
+
+    for processes in process_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            ExpenseLog(os.path.join(directory, "contention.jsonl")).compact(synthetic_expenses(size))
+            tasks = [(directory, seed, operations, read_ratio, compact_after) for seed in range(processes)]
+            start = time.perf_counter()
+            with multiprocessing.Pool(processes) as pool:
+                results = pool.map(_contention_worker, tasks)
+            elapsed = time.perf_counter() - start
+
+            read_times = [t for result in results for t in result[0]]
+            write_times = [t for result in results for t in result[1]]
+            added = sum(result[2] for result in results)
+            conflicts = sum(result[3] for result in results)
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                tracker = ExpenseTracker("contention", directory)
+                problems = tracker.check_indexes()
+            ids = [expense["id"] for expense in tracker.expenses]
+            lost = size + added - len(tracker.expenses)
+            duplicates = len(ids) - len(set(ids))
+
+        print(f"{processes} process(es), {operations} operations each, {elapsed:.2f}s:")
+        print(f"  reads:  {len(read_times):6d}, p50 {percentile(read_times, 0.5):.2f} ms, p99 {percentile(read_times, 0.99):.2f} ms")
+        print(f"  writes: {len(write_times):6d}, p50 {percentile(write_times, 0.5):.2f} ms, p99 {percentile(write_times, 0.99):.2f} ms, "
+              f"{len(write_times) / elapsed:,.0f}/s overall")
+        print(f"  edit conflicts refused: {conflicts}; lost adds: {lost}; duplicate ids: {duplicates}; "
+              f"index problems: {len(problems)}")
+
+
 if __name__ == "__main__":
-    print("=== Welcome to Expense Tracker ===")
-    tracker = ExpenseTracker()
-    tracker.run()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Expense Tracker. Runs the interactive menu when no option is given.")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--import", dest="import_path", metavar="FILE",
+                        help="import expenses from a CSV or JSON Lines file")
+    action.add_argument("--list", action="store_true", help="print expenses as a fixed-width table")
+    action.add_argument("--charts", action="store_true", help="render a category chart for every month")
+    action.add_argument("--check-indexes", action="store_true", help="verify the summary indexes against full scans")
+    action.add_argument("--benchmark-startup", action="store_true", help="time start-up for large ledgers")
+    action.add_argument("--benchmark-summaries", action="store_true", help="time summaries at 1M expenses")
+    action.add_argument("--benchmark-import", action="store_true", help="time bulk CSV import")
+    action.add_argument("--benchmark-charts", action="store_true", help="time monthly chart rendering")
+    action.add_argument("--benchmark-contention", action="store_true", help="time reads and writes by concurrent processes")
+    parser.add_argument("--ledger", default="expenses", help="name of the ledger to open (default: expenses)")
+    parser.add_argument("--errors", metavar="FILE", help="with --import, write rejected rows here")
+    parser.add_argument("--offset", type=int, default=0, help="with --list, skip this many expenses")
+    parser.add_argument("--limit", type=int, default=None, help="with --list, print at most this many expenses")
+    parser.add_argument("--from", dest="start_date", metavar="DATE", help="with --list, earliest date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", metavar="DATE", help="with --list, latest date (YYYY-MM-DD)")
+    parser.add_argument("--category", help="with --list, only this category")
+    parser.add_argument("--year", type=int, help="with --charts, only months of this year")
+    parser.add_argument("--format", choices=["png", "svg"], default="png", help="with --charts, image format")
+    parser.add_argument("--chart-dir", default="charts", help="with --charts, where charts are written")
+    args = parser.parse_args()
+
+    if args.import_path:
+        try:
+            imported, rejected = open_ledger(args.ledger).import_expenses(args.import_path, args.errors)
+        except RuntimeError as e:
+            parser.exit(1, f"{e}\n")
+        print(f"Imported {imported} expenses, rejected {rejected}.")
+    elif args.list:
+        open_ledger(args.ledger).show_expenses_page(args.offset, args.limit, args.start_date, args.end_date, args.category)
+    elif args.charts:
+        tracker = open_ledger(args.ledger)
+        tracker.charts = ChartRenderer(args.chart_dir, args.format)
+        paths = tracker.export_month_charts(args.year)
+        print(f"{len(paths)} charts in {args.chart_dir}")
+    elif args.check_indexes:
+        problems = open_ledger(args.ledger).check_indexes()
+        print("\n".join(problems) if problems else "Indexes are consistent.")
+    elif args.benchmark_startup:
+        benchmark_startup()
+    elif args.benchmark_summaries:
+        benchmark_summaries()
+    elif args.benchmark_import:
+        benchmark_import()
+    elif args.benchmark_charts:
+        benchmark_charts()
+    elif args.benchmark_contention:
+        benchmark_contention()
+    else:
+        print("=== Welcome to Expense Tracker ===")
+        tracker = open_ledger(args.ledger)
+        tracker.run()
\ No newline at end of file
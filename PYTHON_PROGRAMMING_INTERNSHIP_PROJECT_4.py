@@ -1,13 +1,506 @@
+import csv
+import json
+import math
+import os
+import queue
 import random
-import tkinter as tk
-from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+
+def import_gui():
+    """Import tkinter and matplotlib for CoinTossSimulator.
+
+    They are only needed for the window and take most of the start-up time,
+    so batch and console runs never import them. Raises ImportError if
+    either is missing.
+    """
+    global tk, ttk, messagebox, Figure, FigureCanvasTkAgg
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+
+def runs_of_ones(bits):
+    """Return a Counter of {length: count} for the maximal runs of 1 bits in bits.
+
+    After k rounds of bits &= bits >> 1, what is left of each run is k bits
+    shorter, so one popcount of the run starts per round counts the runs
+    longer than k. Runs still left after 64 rounds (only possible with a
+    heavily biased coin) are measured by splitting the binary string, so a
+    long streak does not cost one round per flip.
+    """
+    counts = Counter()
+    rounds = 0
+    remaining = (bits & ~(bits << 1)).bit_count()
+    while bits and rounds < 64:
+        bits &= bits >> 1
+        rounds += 1
+        longer = (bits & ~(bits << 1)).bit_count()
+        if remaining > longer:
+            counts[rounds] = remaining - longer
+        remaining = longer
+    if bits:
+        counts.update(rounds + len(run) for run in format(bits, 'b').split('0') if run)
+    return counts
+
+
+class TossStats:
+    """Counts, run lengths and longest streaks of a sequence of flips, fed in chunks.
+
+    Only the totals and one run-length histogram per side are kept, so memory
+    does not depend on the number of flips. A run that crosses a chunk
+    boundary is carried over and counted once, when it ends.
+    """
 
-class CoinTossSimulator:
     def __init__(self):
+        self.flips = 0
+        self.heads = 0
+        self.run_lengths = {'Heads': Counter(), 'Tails': Counter()}
+        # The run still open at the end of the last chunk
+        self.current = None
+        self.current_length = 0
+
+    @property
+    def tails(self):
+        return self.flips - self.heads
+
+    def add(self, bits, count):
+        """Add count flips given as the low bits of an int (bit i is flip i, 1 for heads)."""
+        mask = (1 << count) - 1
+        self.flips += count
+        self.heads += bits.bit_count()
+        self.run_lengths['Heads'].update(runs_of_ones(bits))
+        self.run_lengths['Tails'].update(runs_of_ones(~bits & mask))
+        
+        # The first and last runs may continue into the neighbouring chunks,
+        # so take them back out and track them through self.current instead
+        first = 'Heads' if bits & 1 else 'Tails'
+        other = ~bits & mask if first == 'Heads' else bits
+        lead = (other & -other).bit_length() - 1 if other else count
+        self._uncount(first, lead)
+        if self.current == first:
+            self.current_length += lead
+        else:
+            self._end_run()
+            self.current, self.current_length = first, lead
+        if lead == count:
+            return
+        
+        last = 'Heads' if bits >> (count - 1) & 1 else 'Tails'
+        other = ~bits & mask if last == 'Heads' else bits
+        trail = count - other.bit_length()
+        self._uncount(last, trail)
+        self._end_run()
+        self.current, self.current_length = last, trail
+
+    def _uncount(self, side, length):
+        self.run_lengths[side][length] -= 1
+        if not self.run_lengths[side][length]:
+            del self.run_lengths[side][length]
+
+    def _end_run(self):
+        if self.current_length:
+            self.run_lengths[self.current][self.current_length] += 1
+
+    def run_length_counts(self, side):
+        """Return {length: number of runs} for 'Heads' or 'Tails', including the open run."""
+        counts = Counter(self.run_lengths[side])
+        if self.current == side and self.current_length:
+            counts[self.current_length] += 1
+        return counts
+
+    @property
+    def runs(self):
+        return sum(sum(self.run_length_counts(side).values()) for side in ('Heads', 'Tails'))
+
+    @property
+    def longest_heads(self):
+        return max(self.run_length_counts('Heads'), default=0)
+
+    @property
+    def longest_tails(self):
+        return max(self.run_length_counts('Tails'), default=0)
+
+
+def longest_run(bits):
+    """Return the length of the longest run of 1 bits in bits.
+
+    bits &= bits >> n keeps the bits starting a run of length + n ones, so the
+    length is found by doubling and then bisecting, in O(log length) steps.
+    """
+    if not bits:
+        return 0
+    length = 1
+    while bits & (bits >> length):
+        bits &= bits >> length
+        length *= 2
+    step = length // 2
+    while step:
+        if bits & (bits >> step):
+            bits &= bits >> step
+            length += step
+        step //= 2
+    return length
+
+
+class TrialStats:
+    """Distributions over repeated trials of the same number of flips.
+
+    Keeps a histogram of head counts and of the longest run (of either face)
+    per trial; the summary statistics are computed from the histograms, so
+    memory depends only on the number of flips per trial.
+    """
+
+    def __init__(self, flips, heads_probability=0.5):
+        self.flips = flips
+        self.heads_probability = heads_probability
+        self.trials = 0
+        self.head_counts = Counter()
+        self.longest_runs = Counter()
+
+    def add(self, bits):
+        """Add one trial given as the low self.flips bits of an int."""
+        self.trials += 1
+        self.head_counts[bits.bit_count()] += 1
+        self.longest_runs[max(longest_run(bits), longest_run(~bits & ((1 << self.flips) - 1)))] += 1
+
+    @property
+    def heads(self):
+        return sum(heads * count for heads, count in self.head_counts.items())
+
+    @property
+    def tails(self):
+        return self.trials * self.flips - self.heads
+
+    @property
+    def mean_heads(self):
+        return self.heads / self.trials
+
+    @property
+    def sd_heads(self):
+        mean = self.mean_heads
+        spread = sum(count * (heads - mean) ** 2 for heads, count in self.head_counts.items())
+        return math.sqrt(spread / (self.trials - 1)) if self.trials > 1 else 0.0
+
+    @staticmethod
+    def wilson_interval(heads, flips, z=1.96):
+        """Wilson score interval for the probability of heads (z=1.96 for 95%)."""
+        estimate = heads / flips
+        centre = (estimate + z * z / (2 * flips)) / (1 + z * z / flips)
+        half_width = z * math.sqrt(estimate * (1 - estimate) / flips + z * z / (4 * flips * flips)) / (1 + z * z / flips)
+        return centre - half_width, centre + half_width
+
+    def confidence_interval(self, z=1.96):
+        """Interval for the probability of heads from all trials' flips together."""
+        return self.wilson_interval(self.heads, self.trials * self.flips, z)
+
+    def coverage(self, z=1.96):
+        """Fraction of trials whose own interval contains the true probability of heads."""
+        covered = 0
+        for heads, count in self.head_counts.items():
+            low, high = self.wilson_interval(heads, self.flips, z)
+            if low <= self.heads_probability <= high:
+                covered += count
+        return covered / self.trials
+
+    @staticmethod
+    def chi_square(heads, flips):
+        """Chi-square statistic and p-value (1 degree of freedom) of heads against a fair coin."""
+        statistic = (2 * heads - flips) ** 2 / flips
+        return statistic, math.erfc(math.sqrt(statistic / 2))
+
+    def fairness(self):
+        """Chi-square test of all trials' flips together against a fair coin."""
+        return self.chi_square(self.heads, self.trials * self.flips)
+
+    def rejection_rate(self, alpha=0.05):
+        """Fraction of trials whose own chi-square test rejects a fair coin at level alpha."""
+        rejected = sum(count for heads, count in self.head_counts.items()
+                       if self.chi_square(heads, self.flips)[1] < alpha)
+        return rejected / self.trials
+
+    def expected_head_counts(self):
+        """Binomial expectation of self.head_counts: {heads: expected number of trials}."""
+        p = self.heads_probability
+        if p in (0, 1):
+            return {self.flips * int(p): float(self.trials)}
+        log_p, log_q = math.log(p), math.log(1 - p)
+        return {heads: self.trials * math.exp(math.lgamma(self.flips + 1) - math.lgamma(heads + 1)
+                                              - math.lgamma(self.flips - heads + 1)
+                                              + heads * log_p + (self.flips - heads) * log_q)
+                for heads in range(self.flips + 1)}
+
+    def summary(self):
+        """Return the statistics as a dict (histograms keyed by str for JSON)."""
+        low, high = self.confidence_interval()
+        chi_square, p_value = self.fairness()
+        return {
+            'trials': self.trials,
+            'flips': self.flips,
+            'heads_probability': self.heads_probability,
+            'mean_heads': round(self.mean_heads, 4),
+            'sd_heads': round(self.sd_heads, 4),
+            'ci_low': round(low, 6),
+            'ci_high': round(high, 6),
+            'chi_square': round(chi_square, 4),
+            'p_value': round(p_value, 6),
+            'rejection_rate': round(self.rejection_rate(), 4),
+            'coverage': round(self.coverage(), 4),
+            'head_counts': {str(heads): count for heads, count in sorted(self.head_counts.items())},
+            'longest_runs': {str(length): count for length, count in sorted(self.longest_runs.items())},
+        }
+
+
+class CoinTossEngine:
+    """Generates coin flips in bulk, independent of the Tk interface.
+
+    Flips come from random.getrandbits as one big int per chunk, bit i being
+    flip i (1 for heads), so a million flips cost a single call and counting
+    heads is a popcount. The same seed, chunk_size and heads_probability
+    give the same flips.
+
+    A biased coin compares each flip's uniform random number with
+    heads_probability one binary digit at a time, 32 digits deep, combining
+    a whole chunk of random bits per digit with | or &. A fair coin needs
+    one digit, i.e. a single getrandbits call.
+    """
+
+    PRECISION = 32
+
+    def __init__(self, seed=None, chunk_size=1 << 20, heads_probability=0.5):
+        self.rng = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.heads_probability = heads_probability
+
+    @property
+    def heads_probability(self):
+        return self._heads_probability
+
+    @heads_probability.setter
+    def heads_probability(self, probability):
+        if not 0 <= probability <= 1:
+            raise ValueError("heads_probability must be between 0 and 1")
+        self._heads_probability = probability
+        scaled = round(probability * (1 << self.PRECISION))
+        self.always_heads = scaled == 1 << self.PRECISION
+        # Binary digits of the probability, least significant first; trailing
+        # zeros would only AND with a running value of 0, so they are dropped
+        self.digits = [scaled >> i & 1 for i in range(self.PRECISION)]
+        while self.digits and not self.digits[0]:
+            self.digits.pop(0)
+
+    def draw(self, count):
+        """Return count flips as the low bits of an int, each 1 (heads) with probability heads_probability."""
+        if self.always_heads:
+            return (1 << count) - 1
+        bits = 0
+        for digit in self.digits:
+            if digit:
+                bits |= self.rng.getrandbits(count)
+            else:
+                bits &= self.rng.getrandbits(count)
+        return bits
+
+    def chunks(self, flips):
+        """Yield (bits, count) chunks making up flips flips."""
+        for start in range(0, flips, self.chunk_size):
+            count = min(self.chunk_size, flips - start)
+            yield self.draw(count), count
+
+    def trials(self, trials, flips):
+        """Return the TrialStats of trials independent runs of flips flips each."""
+        stats = TrialStats(flips, self.heads_probability)
+        for _ in range(trials):
+            stats.add(self.draw(flips))
+        return stats
+
+    def run(self, flips):
+        """Flip flips coins and return their TossStats, in constant memory."""
+        stats = TossStats()
+        for bits, count in self.chunks(flips):
+            stats.add(bits, count)
+        return stats
+
+    @staticmethod
+    def labels(bits, count):
+        """Return the first count flips of a chunk as a list of 'Heads'/'Tails'."""
+        bits &= (1 << count) - 1
+        return ['Heads' if bit == '1' else 'Tails' for bit in reversed(format(bits, f'0{count}b'))]
+
+
+class SessionHistory:
+    """The most recent sessions plus running totals over every session, kept on disk.
+
+    Sessions are held in a ring buffer of max_sessions entries; older ones
+    only survive in the totals. Each new session is appended to a JSON Lines
+    file at path (None keeps nothing on disk). When the file grows past
+    twice the buffer it is rewritten as a "totals" record covering the
+    sessions that dropped out, followed by the buffered sessions.
+    """
+
+    def __init__(self, path="coin_toss_history.jsonl", max_sessions=100):
+        self.path = path
+        self.sessions = deque(maxlen=max_sessions)
+        self.totals = {'sessions': 0, 'flips': 0, 'heads': 0, 'tails': 0}
+        self.lines = 0
+        self.load()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __iter__(self):
+        return iter(self.sessions)
+
+    def _count(self, session):
+        for key in ('flips', 'heads', 'tails'):
+            self.totals[key] += session[key]
+        self.totals['sessions'] += 1
+
+    def load(self):
+        """Read the history file, ignoring a line left unfinished by a crash."""
+        if self.path is None or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self.lines += 1
+                if 'totals' in record:
+                    self.totals = dict(record['totals'])
+                else:
+                    self._count(record)
+                    self.sessions.append(record)
+        if self.lines > 2 * self.sessions.maxlen:
+            self.compact()
+
+    def add(self, flips, heads, tails):
+        """Record a session; returns (the session, whether the oldest one was dropped)."""
+        session = {'number': self.totals['sessions'] + 1, 'flips': flips, 'heads': heads, 'tails': tails}
+        dropped = len(self.sessions) == self.sessions.maxlen
+        self._count(session)
+        self.sessions.append(session)
+        if self.path is not None:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps(session) + "\n")
+            self.lines += 1
+            if self.lines > 2 * self.sessions.maxlen:
+                self.compact()
+        return session, dropped
+
+    def compact(self):
+        """Rewrite the file as totals of the dropped sessions plus the buffered ones."""
+        dropped = dict(self.totals)
+        for session in self.sessions:
+            for key in ('flips', 'heads', 'tails'):
+                dropped[key] -= session[key]
+            dropped['sessions'] -= 1
+        records = [{'totals': dropped}] + list(self.sessions)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write("".join(json.dumps(record) + "\n" for record in records))
+        os.replace(temp_path, self.path)
+        self.lines = len(records)
+
+    def clear(self):
+        """Forget every session, on disk too."""
+        self.sessions.clear()
+        self.totals = {'sessions': 0, 'flips': 0, 'heads': 0, 'tails': 0}
+        self.lines = 0
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    @staticmethod
+    def describe(session):
+        return (f"Session {session['number']}: {session['flips']} flips - "
+                f"Heads: {session['heads']} ({session['heads']/session['flips']*100:.2f}%), "
+                f"Tails: {session['tails']} ({session['tails']/session['flips']*100:.2f}%)")
+
+    def describe_totals(self):
+        flips = self.totals['flips']
+        if not flips:
+            return "No sessions yet."
+        return (f"All {self.totals['sessions']} sessions: {flips} flips - "
+                f"Heads: {self.totals['heads']} ({self.totals['heads']/flips*100:.2f}%), "
+                f"Tails: {self.totals['tails']} ({self.totals['tails']/flips*100:.2f}%)")
+
+
+class TossWorker(threading.Thread):
+    """Runs a simulation on a background thread and reports through a queue.
+
+    The queue receives ("progress", flips done) after every chunk and finally
+    ("done", stats, first flips, last flips, cancelled). Only the first and
+    last `keep` flips are turned into labels, however many are tossed.
+    cancel() stops the run at the next chunk boundary.
+    """
+
+    def __init__(self, engine, flips, keep=50):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.flips = flips
+        self.keep = keep
+        self.messages = queue.Queue()
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        stats = TossStats()
+        first = []
+        last = deque(maxlen=self.keep)
+        for bits, count in self.engine.chunks(self.flips):
+            if self.cancelled.is_set():
+                break
+            if len(first) < self.keep:
+                wanted = min(self.keep - len(first), count)
+                first += self.engine.labels(bits, wanted)
+            wanted = min(self.keep, count)
+            last.extend(self.engine.labels(bits >> (count - wanted), wanted))
+            stats.add(bits, count)
+            self.messages.put(("progress", stats.flips))
+        self.messages.put(("done", stats, first, list(last), self.cancelled.is_set()))
+
+
+class TrialWorker(TossWorker):
+    """Runs a batch of trials on a background thread, like TossWorker.
+
+    The queue receives ("progress", trials done) about a hundred times and
+    finally ("done", trial stats, cancelled).
+    """
+
+    def __init__(self, engine, flips, trials):
+        super().__init__(engine, flips)
+        self.trials = trials
+
+    def run(self):
+        stats = TrialStats(self.flips, self.engine.heads_probability)
+        report_every = max(1, self.trials // 100)
+        for trial in range(1, self.trials + 1):
+            if self.cancelled.is_set():
+                break
+            stats.add(self.engine.draw(self.flips))
+            if trial % report_every == 0:
+                self.messages.put(("progress", trial))
+        self.messages.put(("done", stats, self.cancelled.is_set()))
+
+
+class CoinTossSimulator:
+    # Flips listed at each end of a run, and how often the worker is polled
+    FLIPS_SHOWN = 50
+    POLL_MS = 50
+    
+    def __init__(self, seed=None, history_path="coin_toss_history.jsonl"):
+        import_gui()
+        
         # Initialize session history
-        self.session_history = []
+        self.session_history = SessionHistory(history_path)
+        self.engine = CoinTossEngine(seed)
         
         # Create the main window
         self.root = tk.Tk()
@@ -38,6 +531,21 @@ class CoinTossSimulator:
         self.clear_button = ttk.Button(self.input_frame, text="Clear History", command=self.clear_history)
         self.clear_button.grid(row=0, column=3, padx=5, pady=5)
         
+        self.cancel_button = ttk.Button(self.input_frame, text="Cancel", command=self.cancel_tosses, state=tk.DISABLED)
+        self.cancel_button.grid(row=0, column=4, padx=5, pady=5)
+        
+        ttk.Label(self.input_frame, text="Chance of heads:").grid(row=1, column=0, padx=5, pady=5)
+        self.probability_var = tk.StringVar(value="0.5")
+        ttk.Entry(self.input_frame, textvariable=self.probability_var).grid(row=1, column=1, padx=5, pady=5)
+        
+        ttk.Label(self.input_frame, text="Trials:").grid(row=1, column=2, padx=5, pady=5)
+        self.trials_var = tk.StringVar(value="1")
+        ttk.Entry(self.input_frame, textvariable=self.trials_var, width=10).grid(row=1, column=3, padx=5, pady=5)
+        
+        self.progress = ttk.Progressbar(self.input_frame, length=200)
+        self.progress.grid(row=2, column=0, columnspan=5, sticky=tk.EW, padx=5, pady=5)
+        self.worker = None
+        
         # Results section
         self.result_text = tk.Text(self.result_frame, height=10, width=40)
         self.result_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -51,93 +559,186 @@ class CoinTossSimulator:
         ttk.Label(self.history_frame, text="Session History:").pack(anchor=tk.W)
         self.history_text = tk.Text(self.history_frame, height=5, width=40)
         self.history_text.pack(fill=tk.X)
+        self.totals_var = tk.StringVar(value=self.session_history.describe_totals())
+        ttk.Label(self.history_frame, textvariable=self.totals_var).pack(anchor=tk.W)
+        self.history_text.insert(tk.END, "".join(SessionHistory.describe(session) + "\n"
+                                                 for session in self.session_history))
         
         # Prepare for plotting
-        self.fig = plt.Figure(figsize=(6, 4))
+        self.fig = Figure(figsize=(6, 4))
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.result_frame)
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_packed = False
+        # Pie and bar artists of the heads/tails plots, reused between tosses
+        self.toss_artists = None
         
         # Start the main loop
         self.root.mainloop()
     
     def coin_toss(self):
         """Simulates a single coin toss and returns 'Heads' or 'Tails'"""
-        return random.choice(['Heads', 'Tails'])
+        return 'Heads' if self.engine.rng.getrandbits(1) else 'Tails'
     
     def perform_tosses(self):
-        """Performs coin tosses based on user input and displays results"""
+        """Starts the coin tosses requested by the user on a background worker"""
         try:
             num_flips = int(self.flips_var.get())
-            if num_flips <= 0:
+            num_trials = int(self.trials_var.get())
+            if num_flips <= 0 or num_trials <= 0:
                 messagebox.showerror("Error", "Please enter a positive number.")
                 return
-                
-            # Clear previous results
-            self.result_text.delete(1.0, tk.END)
-            
-            # Perform the coin tosses
-            heads_count = 0
-            tails_count = 0
-            results = []
-            
-            self.result_text.insert(tk.END, "Flipping the coin...\n\n")
-            
-            for i in range(num_flips):
-                result = self.coin_toss()
-                results.append(result)
-                if result == 'Heads':
-                    heads_count += 1
-                else:
-                    tails_count += 1
-                self.result_text.insert(tk.END, f"Flip {i+1}: {result}\n")
-            
-            # Display the summary
-            heads_percent = (heads_count/num_flips)*100
-            tails_percent = (tails_count/num_flips)*100
-            
-            summary = f"\nResults Summary:\n"
-            summary += f"Total Flips: {num_flips}\n"
-            summary += f"Heads: {heads_count} ({heads_percent:.2f}%)\n"
-            summary += f"Tails: {tails_count} ({tails_percent:.2f}%)\n"
-            
-            self.result_text.insert(tk.END, summary)
-            
-            # Add to session history
-            self.session_history.append({
-                'flips': num_flips,
-                'heads': heads_count,
-                'tails': tails_count
-            })
-            self.update_history()
-            
-            # Update the visualization
-            self.update_visualization(heads_count, tails_count)
-            
+            self.engine.heads_probability = float(self.probability_var.get())
         except ValueError:
-            messagebox.showerror("Error", "Please enter a valid number.")
+            messagebox.showerror("Error", "Please enter a valid number, and a chance of heads between 0 and 1.")
+            return
+        
+        # Clear previous results
+        self.result_text.delete(1.0, tk.END)
+        
+        self.toss_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        if num_trials == 1:
+            self.result_text.insert(tk.END, "Flipping the coin...\n\n")
+            self.progress.config(maximum=num_flips, value=0)
+            self.worker = TossWorker(self.engine, num_flips, keep=self.FLIPS_SHOWN)
+            self.show_worker_results = self.show_results
+        else:
+            self.result_text.insert(tk.END, f"Running {num_trials:,} trials of {num_flips:,} flips...\n")
+            self.progress.config(maximum=num_trials, value=0)
+            self.worker = TrialWorker(self.engine, num_flips, num_trials)
+            self.show_worker_results = self.show_trial_results
+        self.worker.start()
+        self.root.after(self.POLL_MS, self.poll_worker)
     
-    def update_history(self):
-        """Updates the history display with session information"""
-        self.history_text.delete(1.0, tk.END)
+    def cancel_tosses(self):
+        """Asks the running simulation to stop"""
+        if self.worker is not None:
+            self.worker.cancel()
+    
+    def poll_worker(self):
+        """Applies the worker's queued messages; runs on the Tk thread via root.after"""
+        while True:
+            try:
+                message = self.worker.messages.get_nowait()
+            except queue.Empty:
+                self.root.after(self.POLL_MS, self.poll_worker)
+                return
+            if message[0] == "progress":
+                self.progress.config(value=message[1])
+            else:
+                self.worker = None
+                self.toss_button.config(state=tk.NORMAL)
+                self.cancel_button.config(state=tk.DISABLED)
+                self.show_worker_results(*message[1:])
+                return
+    
+    def show_results(self, stats, first, last, cancelled):
+        """Displays the shown flips and summary of a finished run"""
+        num_flips = stats.flips
+        lines = [f"Flip {i}: {result}" for i, result in enumerate(first, 1)]
+        hidden = num_flips - len(first) - len(last)
+        if hidden > 0:
+            lines.append(f"... {hidden:,} more flips ...")
+        # The last flips may overlap the first ones when few flips were made
+        start = max(num_flips - len(last), len(first)) + 1
+        shown = num_flips - start + 1
+        lines += [f"Flip {i}: {result}" for i, result in enumerate(last[len(last) - shown:], start)]
+        self.result_text.insert(tk.END, "\n".join(lines) + "\n")
+        
+        if cancelled:
+            self.result_text.insert(tk.END, f"\nCancelled after {num_flips:,} flips.\n")
+            if not num_flips:
+                return
+        
+        heads_count = stats.heads
+        tails_count = stats.tails
+        
+        # Display the summary
+        heads_percent = (heads_count/num_flips)*100
+        tails_percent = (tails_count/num_flips)*100
+        
+        summary = f"\nResults Summary:\n"
+        summary += f"Total Flips: {num_flips}\n"
+        summary += f"Heads: {heads_count} ({heads_percent:.2f}%)\n"
+        summary += f"Tails: {tails_count} ({tails_percent:.2f}%)\n"
+        summary += f"Longest streaks: {stats.longest_heads} heads, {stats.longest_tails} tails\n"
+        
+        self.result_text.insert(tk.END, summary)
+        if cancelled:
+            return
         
-        for i, session in enumerate(self.session_history):
-            self.history_text.insert(tk.END, f"Session {i+1}: {session['flips']} flips - "
-                                            f"Heads: {session['heads']} ({session['heads']/session['flips']*100:.2f}%), "
-                                            f"Tails: {session['tails']} ({session['tails']/session['flips']*100:.2f}%)\n")
+        # Add to session history
+        self.update_history(num_flips, heads_count, tails_count)
+        
+        # Update the visualization
+        self.update_visualization(heads_count, tails_count)
+    
+    def show_trial_results(self, stats, cancelled):
+        """Displays the distribution statistics of a finished batch of trials"""
+        if cancelled:
+            self.result_text.insert(tk.END, f"\nCancelled after {stats.trials:,} trials.\n")
+        if not stats.trials:
+            return
+        
+        low, high = stats.confidence_interval()
+        chi_square, p_value = stats.fairness()
+        summary = f"\nTrial Summary ({stats.trials:,} trials of {stats.flips:,} flips, "
+        summary += f"chance of heads {stats.heads_probability}):\n"
+        summary += f"Heads per trial: mean {stats.mean_heads:.2f}, standard deviation {stats.sd_heads:.2f}\n"
+        summary += f"Most common longest run: {max(stats.longest_runs, key=stats.longest_runs.get)} "
+        summary += f"(range {min(stats.longest_runs)}-{max(stats.longest_runs)})\n"
+        summary += f"95% confidence interval for heads: {low*100:.3f}% - {high*100:.3f}%\n"
+        summary += f"Trials whose own 95% interval covers the true chance: {stats.coverage()*100:.1f}%\n"
+        summary += f"Fairness (chi-square, all flips): {chi_square:.3f}, p = {p_value:.4f}\n"
+        summary += f"Trials rejecting a fair coin at 5%: {stats.rejection_rate()*100:.1f}%\n"
+        self.result_text.insert(tk.END, summary)
+        if cancelled:
+            return
+        
+        self.update_history(stats.trials * stats.flips, stats.heads, stats.tails)
+        self.update_visualization(stats.heads, stats.tails, trial_stats=stats)
+    
+    def update_history(self, flips, heads, tails):
+        """Records a session and appends its line to the history display"""
+        session, dropped = self.session_history.add(flips, heads, tails)
+        if dropped:
+            self.history_text.delete("1.0", "2.0")
+        self.history_text.insert(tk.END, SessionHistory.describe(session) + "\n")
+        self.history_text.see(tk.END)
+        self.totals_var.set(self.session_history.describe_totals())
     
     def clear_history(self):
         """Clears the session history"""
-        self.session_history = []
+        self.session_history.clear()
+        self.totals_var.set(self.session_history.describe_totals())
         self.history_text.delete(1.0, tk.END)
         self.result_text.delete(1.0, tk.END)
         if self.canvas_packed:
             self.canvas_widget.pack_forget()
             self.canvas_packed = False
     
-    def update_visualization(self, heads, tails):
-        """Updates the graphical representation of results"""
-        # Clear previous plot
+    def update_visualization(self, heads, tails, trial_stats=None):
+        """Updates the graphical representation of results
+        
+        The heads/tails pie and bar charts are drawn once and then updated in
+        place. With trial_stats, shows the distributions over the trials instead.
+        """
+        if trial_stats is not None:
+            self.draw_trial_plots(trial_stats)
+        else:
+            if self.toss_artists is None:
+                self.draw_toss_plots()
+            self.update_toss_plots(heads, tails)
+        
+        # Add to display if not already there
+        if not self.canvas_packed:
+            self.canvas_widget.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+            self.canvas_packed = True
+            
+        self.canvas.draw_idle()
+    
+    def draw_toss_plots(self):
+        """Creates the pie and bar charts that update_toss_plots fills in"""
         self.fig.clear()
         
         # Create two subplots
@@ -146,41 +747,280 @@ class CoinTossSimulator:
         
         # Data
         labels = ['Heads', 'Tails']
-        sizes = [heads, tails]
         colors = ['#ff9999', '#66b3ff']
         
         # Pie chart
-        ax1.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
+        wedges, texts, autotexts = ax1.pie([1, 1], labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
         ax1.axis('equal')
         ax1.set_title('Coin Toss Results')
         
         # Bar chart
-        ax2.bar(labels, sizes, color=colors)
+        bars = ax2.bar(labels, [0, 0], color=colors)
         ax2.set_ylabel('Count')
         ax2.set_title('Heads vs Tails')
         
-        # Add to display if not already there
-        if not self.canvas_packed:
-            self.canvas_widget.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
-            self.canvas_packed = True
-            
-        self.canvas.draw()
+        self.toss_artists = (wedges, texts, autotexts, bars, ax2)
+    
+    def update_toss_plots(self, heads, tails):
+        """Moves the existing pie wedges, labels and bars to new counts"""
+        wedges, texts, autotexts, bars, bar_axes = self.toss_artists
+        total = heads + tails
+        angle = 90
+        for wedge, text, autotext, size in zip(wedges, texts, autotexts, (heads, tails)):
+            # Same geometry as Axes.pie: labels at 1.1 radii, percentages at 0.6
+            sweep = 360 * size / total
+            wedge.set_theta1(angle)
+            wedge.set_theta2(angle + sweep)
+            middle = math.radians(angle + sweep / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            text.set_position((1.1 * x, 1.1 * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text(f"{size / total * 100:.1f}%")
+            for artist in (wedge, text, autotext):
+                artist.set_visible(size > 0)
+            angle += sweep
+        
+        for bar, size in zip(bars, (heads, tails)):
+            bar.set_height(size)
+        bar_axes.set_ylim(0, max(heads, tails) * 1.05)
+    
+    def draw_trial_plots(self, trial_stats):
+        """Draws the head count and longest run distributions of a batch of trials"""
+        self.fig.clear()
+        self.toss_artists = None
+        ax1 = self.fig.add_subplot(121)
+        ax2 = self.fig.add_subplot(122)
+        colors = ['#ff9999', '#66b3ff']
+        
+        # Head count distribution against the binomial expectation
+        counts = sorted(trial_stats.head_counts.items())
+        ax1.bar([h for h, _ in counts], [c for _, c in counts], width=1.0, color=colors[0])
+        expected = trial_stats.expected_head_counts()
+        shown = range(counts[0][0], counts[-1][0] + 1)
+        ax1.plot(list(shown), [expected.get(h, 0) for h in shown], color='black', linewidth=1)
+        ax1.set_xlabel('Heads per trial')
+        ax1.set_ylabel('Trials')
+        ax1.set_title('Head Count Distribution')
+        
+        runs = sorted(trial_stats.longest_runs.items())
+        ax2.bar([r for r, _ in runs], [c for _, c in runs], width=1.0, color=colors[1])
+        ax2.set_xlabel('Longest run')
+        ax2.set_title('Longest Run Distribution')
+
+
+def benchmark_engine(flips=100_000_000, seed=0):
+    """Compare flipping one coin at a time with the bulk engine."""
+    sample = 1_000_000
+    start = time.perf_counter()
+    heads = 0
+    for _ in range(sample):
+        if random.choice(['Heads', 'Tails']) == 'Heads':
+            heads += 1
+    per_flip = (time.perf_counter() - start) / sample
+    print(f"random.choice per flip: {1 / per_flip:,.0f} flips/s ({per_flip * flips:.1f}s for {flips:,} flips, estimated)")
+
+    start = time.perf_counter()
+    stats = CoinTossEngine(seed).run(flips)
+    elapsed = time.perf_counter() - start
+    print(f"CoinTossEngine.run:     {flips / elapsed:,.0f} flips/s ({elapsed:.1f}s for {flips:,} flips)")
+    print(f"  heads {stats.heads:,}, tails {stats.tails:,}, runs {stats.runs:,}, "
+          f"longest streaks {stats.longest_heads} heads / {stats.longest_tails} tails")
+
+
+def simulate(config):
+    """Run one configuration and return its results as a dict.
+
+    config has flips and seed, and optionally heads_probability and trials;
+    with more than one trial the result holds the TrialStats summary.
+    """
+    flips, seed = config['flips'], config['seed']
+    heads_probability = config.get('heads_probability', 0.5)
+    start = time.perf_counter()
+    engine = CoinTossEngine(seed, heads_probability=heads_probability)
+    if config.get('trials', 1) > 1:
+        result = {'seed': seed}
+        result.update(engine.trials(config['trials'], flips).summary())
+        result['seconds'] = round(time.perf_counter() - start, 4)
+        return result
+    stats = engine.run(flips)
+    return {
+        'flips': flips,
+        'seed': seed,
+        'heads_probability': heads_probability,
+        'heads': stats.heads,
+        'tails': stats.tails,
+        'heads_percent': round(stats.heads / flips * 100, 4) if flips else 0.0,
+        'runs': stats.runs,
+        'longest_heads': stats.longest_heads,
+        'longest_tails': stats.longest_tails,
+        'seconds': round(time.perf_counter() - start, 4),
+    }
+
+
+def run_batch(configs, jobs=None):
+    """Run configurations across a process pool, returning results in order."""
+    configs = list(configs)
+    if jobs == 1 or len(configs) <= 1:
+        return [simulate(config) for config in configs]
+    import multiprocessing
+    with multiprocessing.Pool(jobs) as pool:
+        return pool.map(simulate, configs, chunksize=1)
+
+
+def read_configs(path):
+    """Read configurations from a CSV file with a header or a JSON Lines file.
+
+    Each row has flips and optionally seed, heads_probability and trials.
+    A missing or empty seed is replaced by a random one, so every result
+    can be reproduced from its recorded seed.
+    """
+    with open(path, newline='', encoding='utf-8') as file:
+        if path.lower().endswith('.csv'):
+            rows = list(csv.DictReader(file))
+        else:
+            rows = [json.loads(line) for line in file if line.strip()]
+    configs = []
+    for number, row in enumerate(rows, 1):
+        try:
+            flips = int(row['flips'])
+            seed = row.get('seed')
+            seed = random.randrange(2**63) if seed in (None, '') else int(seed)
+            heads_probability = float(row.get('heads_probability') or 0.5)
+            trials = int(row.get('trials') or 1)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{path}: bad configuration on row {number}: {e}") from None
+        if flips <= 0 or trials <= 0:
+            raise ValueError(f"{path}: flips and trials must be positive on row {number}")
+        if not 0 <= heads_probability <= 1:
+            raise ValueError(f"{path}: heads_probability must be between 0 and 1 on row {number}")
+        configs.append({'flips': flips, 'seed': seed, 'heads_probability': heads_probability, 'trials': trials})
+    return configs
+
+
+def write_results(results, output=None, output_format=None):
+    """Write results as JSON or CSV to the output path, or to stdout."""
+    if output_format is None:
+        output_format = 'csv' if output and output.lower().endswith('.csv') else 'json'
+    file = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+    try:
+        if output_format == 'csv':
+            # Distributions (trial histograms) only fit in JSON
+            fieldnames = list(dict.fromkeys(key for result in results for key, value in result.items()
+                                            if not isinstance(value, dict)))
+            writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(results)
+        else:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+    finally:
+        if output:
+            file.close()
+
+
+def batch_main(argv=None):
+    """Command-line entry point for headless batch runs; returns the exit status."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Run coin toss simulations without a window. "
+                                                 "Runs the graphical interface when no option is given.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--flips', type=int, nargs='+', metavar='N', help="numbers of flips to simulate")
+    source.add_argument('--configs', metavar='FILE', help="CSV or JSON Lines file of flips and seed")
+    source.add_argument('--benchmark', action='store_true', help="time the engine against per-flip tossing")
+    parser.add_argument('--seeds', type=int, nargs='+', metavar='S',
+                        help="with --flips, run every flip count with each of these seeds")
+    parser.add_argument('--p-heads', type=float, default=0.5, metavar='P',
+                        help="with --flips, chance of heads for a biased coin (default: 0.5)")
+    parser.add_argument('--trials', type=int, default=1, metavar='T',
+                        help="with --flips, repeat each run T times and report distribution statistics")
+    parser.add_argument('-j', '--jobs', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('-o', '--output', metavar='FILE', help="write results here instead of stdout")
+    parser.add_argument('--format', choices=['json', 'csv'], help="output format (default: from --output, else json)")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark_engine()
+        return 0
+    try:
+        if args.configs:
+            configs = read_configs(args.configs)
+        elif args.flips:
+            if any(flips <= 0 for flips in args.flips) or args.trials <= 0:
+                parser.error("flips and trials must be positive")
+            if not 0 <= args.p_heads <= 1:
+                parser.error("--p-heads must be between 0 and 1")
+            seeds = args.seeds or [random.randrange(2**63)]
+            configs = [{'flips': flips, 'seed': seed, 'heads_probability': args.p_heads, 'trials': args.trials}
+                       for flips in args.flips for seed in seeds]
+        else:
+            parser.error("one of --flips, --configs or --benchmark is required")
+        write_results(run_batch(configs, args.jobs), args.output, args.format)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_simulation(session_history):
+    """Runs one console session of coin tosses; returns whether to continue"""
+    try:
+        num_flips = int(input("\nNumber of flips: "))
+        if num_flips <= 0:
+            print("Please enter a positive number.")
+            return True
+    except ValueError:
+        print("Please enter a valid number.")
+        return True
+    
+    print("\nFlipping the coin...\n")
+    engine = CoinTossEngine()
+    stats = TossStats()
+    shown = CoinTossSimulator.FLIPS_SHOWN
+    for bits, count in engine.chunks(num_flips):
+        if stats.flips < shown:
+            for i, result in enumerate(engine.labels(bits, min(shown - stats.flips, count)), stats.flips + 1):
+                print(f"Flip {i}: {result}")
+        stats.add(bits, count)
+    if num_flips > shown:
+        print(f"... {num_flips - shown:,} more flips ...")
+    
+    print("\nResults Summary:")
+    print(f"Total Flips: {num_flips}")
+    print(f"Heads: {stats.heads} ({stats.heads/num_flips*100:.2f}%)")
+    print(f"Tails: {stats.tails} ({stats.tails/num_flips*100:.2f}%)")
+    print(f"Longest streaks: {stats.longest_heads} heads, {stats.longest_tails} tails")
+    
+    session, _ = session_history.add(num_flips, stats.heads, stats.tails)
+    print("\n" + SessionHistory.describe(session))
+    print(session_history.describe_totals())
+    
+    return input("\nToss again? (y/n): ").lower() == 'y'
 
 
 def main():
     """Main function to run the program"""
     try:
-        import tkinter
-        import matplotlib
+        import_gui()
         print("Starting graphical interface...")
         CoinTossSimulator()
+        return
     except ImportError:
         print("Required libraries not available, running console version...")
-        session_history = []
-        continue_simulation = True
-        while continue_simulation:
-            continue_simulation = run_simulation(session_history)
+    except tk.TclError as e:
+        print(f"Cannot open a window ({e}), running console version...")
+    session_history = SessionHistory()
+    if len(session_history):
+        print("Session History:")
+        for session in session_history:
+            print(SessionHistory.describe(session))
+    continue_simulation = True
+    while continue_simulation:
+        continue_simulation = run_simulation(session_history)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        sys.exit(batch_main())
+    else:
+        main()
\ No newline at end of file
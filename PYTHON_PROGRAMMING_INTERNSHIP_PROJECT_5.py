@@ -1,4 +1,71 @@
 import os
+import contextlib
+import functools
+import mmap
+import multiprocessing
+import re
+import sys
+import time
+import unicodedata
+from collections import deque
+from itertools import chain
+
+import text_tokens
+
+# Bytes of input handled at a time by the file reversers
+BLOCK_SIZE = 1 << 20
+
+# Bytes of input sent to a pipeline worker at a time
+CHUNK_SIZE = 4 << 20
+# A blank or whitespace-only line with the newline before it, where read_chunks cuts paragraphs
+PARAGRAPH_BREAK = re.compile(rb"\n[ \t\r\f\v]*\n")
+
+# Grapheme cluster break properties (UAX #29) that the general category does
+# not give, as regular expression ranges. Regional indicators pair up into
+# flags; Hangul jamo and syllables combine by the L/V/T/LV/LVT rules
+REGIONAL_INDICATORS = '\U0001f1e6-\U0001f1ff'
+HANGUL_LEADING = '\u1100-\u115f\ua960-\ua97c'
+HANGUL_VOWELS = '\u1160-\u11a7\ud7b0-\ud7c6'
+HANGUL_TRAILING = '\u11a8-\u11ff\ud7cb-\ud7fb'
+# Letters and spacing marks that extend a cluster like combining marks do
+# (Other_Grapheme_Extend), plus the emoji skin tone modifiers
+OTHER_EXTEND = ('\u09be\u09d7\u0b3e\u0b57\u0bbe\u0bd7\u0cc2\u0cd5-\u0cd6\u0d3e\u0d57\u0dcf\u0ddf\u1b35\u200c'
+                '\u302e-\u302f\uff9e-\uff9f\U0001133e\U00011357\U000114b0\U000114bd\U000115af\U00011930'
+                '\U0001d165\U0001d16e-\U0001d172\U000e0020-\U000e007f\U0001f3fb-\U0001f3ff')
+# Spacing marks that do not join the character before them, and two letters that do
+NOT_SPACING_MARKS = ('\u102b-\u102c\u1038\u1062-\u1064\u1067-\u106d\u1083\u1087-\u108c\u108f\u109a-\u109c'
+                     '\u1a61\u1a63-\u1a64\uaa7b\uaa7d\U00011720-\U00011721')
+OTHER_SPACING_MARKS = '\u0e33\u0eb3'
+# Characters that join the character after them (Prepend)
+PREPEND = ('\u0600-\u0605\u06dd\u070f\u0890-\u0891\u08e2\u0d4e\U000110bd\U000110cd\U000111c2-\U000111c3'
+           '\U0001193f\U00011941\U00011a3a\U00011a84-\U00011a89\U00011d46')
+# Emoji and the code points reserved for them, which ZWJ joins into one
+# cluster (Extended_Pictographic, from Unicode's emoji-data.txt)
+EXTENDED_PICTOGRAPHIC = ('\u00a9\u00ae\u203c\u2049\u2122\u2139\u2194-\u2199\u21a9-\u21aa\u231a-\u231b\u2328\u23cf'
+                         '\u23e9-\u23f3\u23f8-\u23fa\u24c2\u25aa-\u25ab\u25b6\u25c0\u25fb-\u25fe\u2600-\u2604\u260e'
+                         '\u2611\u2614-\u2615\u2618\u261d\u2620\u2622-\u2623\u2626\u262a\u262e-\u262f\u2638-\u263a'
+                         '\u2640\u2642\u2648-\u2653\u265f-\u2660\u2663\u2665-\u2666\u2668\u267b\u267e-\u267f'
+                         '\u2692-\u2697\u2699\u269b-\u269c\u26a0-\u26a1\u26a7\u26aa-\u26ab\u26b0-\u26b1\u26bd-\u26be'
+                         '\u26c4-\u26c5\u26c8\u26ce-\u26cf\u26d1\u26d3-\u26d4\u26e9-\u26ea\u26f0-\u26f5\u26f7-\u26fa'
+                         '\u26fd\u2702\u2705\u2708-\u270d\u270f\u2712\u2714\u2716\u271d\u2721\u2728\u2733-\u2734\u2744'
+                         '\u2747\u274c\u274e\u2753-\u2755\u2757\u2763-\u2764\u2795-\u2797\u27a1\u27b0\u27bf'
+                         '\u2934-\u2935\u2b05-\u2b07\u2b1b-\u2b1c\u2b50\u2b55\u3030\u303d\u3297\u3299\U0001f004'
+                         '\U0001f02c-\U0001f02f\U0001f094-\U0001f09f\U0001f0af-\U0001f0b0\U0001f0c0'
+                         '\U0001f0cf-\U0001f0d0\U0001f0f6-\U0001f0ff\U0001f170-\U0001f171\U0001f17e-\U0001f17f'
+                         '\U0001f18e\U0001f191-\U0001f19a\U0001f1af-\U0001f1e5\U0001f201-\U0001f20f\U0001f21a'
+                         '\U0001f22f\U0001f232-\U0001f23a\U0001f23c-\U0001f23f\U0001f249-\U0001f25f'
+                         '\U0001f266-\U0001f321\U0001f324-\U0001f393\U0001f396-\U0001f397\U0001f399-\U0001f39b'
+                         '\U0001f39e-\U0001f3f0\U0001f3f3-\U0001f3f5\U0001f3f7-\U0001f3fa\U0001f400-\U0001f4fd'
+                         '\U0001f4ff-\U0001f53d\U0001f549-\U0001f54e\U0001f550-\U0001f567\U0001f56f-\U0001f570'
+                         '\U0001f573-\U0001f57a\U0001f587\U0001f58a-\U0001f58d\U0001f590\U0001f595-\U0001f596'
+                         '\U0001f5a4-\U0001f5a5\U0001f5a8\U0001f5b1-\U0001f5b2\U0001f5bc\U0001f5c2-\U0001f5c4'
+                         '\U0001f5d1-\U0001f5d3\U0001f5dc-\U0001f5de\U0001f5e1\U0001f5e3\U0001f5e8\U0001f5ef\U0001f5f3'
+                         '\U0001f5fa-\U0001f64f\U0001f680-\U0001f6c5\U0001f6cb-\U0001f6d2\U0001f6d5-\U0001f6e5'
+                         '\U0001f6e9\U0001f6eb-\U0001f6f0\U0001f6f3-\U0001f6ff\U0001f7dc-\U0001f7f0'
+                         '\U0001f80c-\U0001f80f\U0001f848-\U0001f84f\U0001f85a-\U0001f85f\U0001f888-\U0001f88f'
+                         '\U0001f8ae-\U0001f8af\U0001f8bc-\U0001f8bf\U0001f8c2-\U0001f8cf\U0001f8d9-\U0001f8ff'
+                         '\U0001f90c-\U0001f93a\U0001f93c-\U0001f945\U0001f947-\U0001f9ff\U0001fa58-\U0001fa5f'
+                         '\U0001fa6e-\U0001faff\U0001fc00-\U0001fffd')
 
 def reverse_character_order(text):
     """Reverses the character order of the input text."""
@@ -9,6 +76,442 @@ def reverse_word_order(text):
     words = text.split()
     return ' '.join(reversed(words))
 
+def char_ranges(codes):
+    """Turns sorted code points into the ranges of a regular expression character class."""
+    ranges = []
+    for code in codes:
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return ''.join(re.escape(chr(first)) + ('-' + re.escape(chr(last)) if last > first else '')
+                   for first, last in ranges)
+
+def code_points(ranges):
+    """Turns the ranges of a regular expression character class into a set of code points."""
+    codes = set()
+    for first, last in re.findall(r'(.)(?:-(.))?', ranges, re.S):
+        codes.update(range(ord(first), ord(last or first) + 1))
+    return codes
+
+def char_class(codes):
+    """Returns a regular expression matching any of the code points.
+    
+    A class of only BMP characters is matched with a lookup table, but one
+    that also holds astral characters is searched range by range, so those
+    are kept in a second class behind a quick check for any astral character.
+    """
+    bmp = sorted(code for code in codes if code < 0x10000)
+    astral = sorted(code for code in codes if code >= 0x10000)
+    if not astral:
+        return f'[{char_ranges(bmp)}]'
+    astral_class = f'(?=[\U00010000-\U0010ffff])[{char_ranges(astral)}]'
+    return f'(?:[{char_ranges(bmp)}]|{astral_class})' if bmp else astral_class
+
+@functools.lru_cache(maxsize=None)
+def grapheme_patterns():
+    """Returns regular expressions for extended grapheme clusters, characters that may join the one
+    before, and characters that always start a cluster.
+    
+    Built on first use (under 0.1 s) from the general categories in
+    unicodedata and the tables above, following the rules of UAX #29 for the
+    Unicode version of unicodedata: CR LF, controls, Hangul syllables,
+    characters followed by marks, ZWJ or spacing marks, prepended
+    characters, emoji ZWJ sequences and flags.
+    """
+    other_extend = code_points(OTHER_EXTEND)
+    not_spacing = code_points(NOT_SPACING_MARKS)
+    prepend = code_points(PREPEND)
+    extend, spacing, controls = set(), code_points(OTHER_SPACING_MARKS), set()
+    # No marks or format characters are assigned outside these planes
+    for code in chain(range(0x20000), range(0xE0000, 0xE1000)):
+        category = unicodedata.category(chr(code))
+        if code in other_extend or category in ('Mn', 'Me'):
+            extend.add(code)
+        elif category == 'Mc':
+            if code not in not_spacing:
+                spacing.add(code)
+        elif category in ('Cc', 'Cf', 'Zl', 'Zp', 'Cs') and code not in prepend:
+            controls.add(code)
+        elif category == 'Cn' and (code == 0x2065 or 0xFFF0 <= code <= 0xFFF8 or code >= 0xE0000):
+            # Unassigned default ignorable code points
+            controls.add(code)
+    controls -= {0x0D, 0x0A, 0x200C, 0x200D}
+    # Only the BMP ones are needed below, as every astral character is a candidate
+    joining = sorted(code for code in extend | spacing if code < 0x10000)
+    # Everything that joins the character before it, in one class
+    postcore = char_class(extend | spacing | {0x200D})
+    extend = char_class(extend)
+    pictographic = char_class(code_points(EXTENDED_PICTOGRAPHIC))
+    leading, vowel, trailing = f'[{HANGUL_LEADING}]', f'[{HANGUL_VOWELS}]', f'[{HANGUL_TRAILING}]'
+    # Precomposed syllables are LV (no final consonant, so a vowel may follow) or LVT
+    syllables = range(0xAC00, 0xD7A4)
+    lv = f'[{char_ranges(syllables[::28])}]'
+    lvt = f'[{char_ranges(code for code in syllables if (code - 0xAC00) % 28)}]'
+    # Behind one quick check, as most text has no Hangul
+    hangul = (f'(?=[{HANGUL_LEADING}{HANGUL_VOWELS}{HANGUL_TRAILING}\uac00-\ud7a3])'
+              f'(?:{leading}*(?:{vowel}+|{lv}{vowel}*|{lvt}){trailing}*|{leading}+|{trailing}+)')
+    core = (f'{hangul}|[{REGIONAL_INDICATORS}]{{2}}|{pictographic}(?:{extend}*\u200d{pictographic})*'
+            f'|(?!{char_class(controls)})[^\r\n]')
+    clusters = re.compile(f'\r\n|{char_class(prepend)}*(?:{core}){postcore}*|.', re.S)
+    # Candidates only, in one class so it is searched quickly: CR stands
+    # for CR LF, a prepended character or leading jamo for what follows it,
+    # ZWJ for the emoji after it, and every astral character for the marks,
+    # flags and emoji among them
+    joiners = re.compile(f'[{char_ranges(joining)}\u200d\r{HANGUL_LEADING}{HANGUL_VOWELS}{HANGUL_TRAILING}'
+                         f'{PREPEND}\U00010000-\U0010ffff]')
+    # A cluster starts at these whatever came before the character preceding them
+    starts = re.compile(f'(?<![{PREPEND}\r\u200d])(?!{postcore})'
+                        f'[^\n{HANGUL_LEADING}{HANGUL_VOWELS}{HANGUL_TRAILING}\uac00-\ud7a3{REGIONAL_INDICATORS}]')
+    return clusters, joiners, starts
+
+def reverse_grapheme_order(text):
+    """Reverses the order of the user-perceived characters (grapheme clusters) in the input text.
+    
+    Unlike reverse_character_order this keeps accented letters, emoji
+    sequences, flags and CR LF pairs intact. Text without combining marks or
+    other joining characters, such as plain ASCII or Latin-1, is simply
+    sliced; otherwise the reversed code points are put back in order cluster
+    by cluster in a UTF-32 buffer.
+    """
+    if '\r' not in text:
+        if text.isascii():
+            return text[::-1]
+        try:
+            # Latin-1 has no combining marks, and such text is stored one
+            # byte per character, so this check costs next to nothing
+            text.encode('latin-1')
+            return text[::-1]
+        except UnicodeEncodeError:
+            pass
+    clusters, joiners, _ = grapheme_patterns()
+    found = joiners.search(text)
+    if found is None:
+        return text[::-1]
+    size = len(text)
+    source = memoryview(text.encode('utf-32-le', 'surrogatepass'))
+    output = bytearray(text[::-1].encode('utf-32-le', 'surrogatepass'))
+    done = 0
+    while found is not None:
+        position = found.start()
+        # Everything since the last cluster is a plain character, so a cluster
+        # holding this one starts either just before it or at it
+        match = clusters.match(text, position - 1) if position > done else None
+        if match is None or match.end() <= position:
+            match = clusters.match(text, position)
+        if match is None:
+            found = joiners.search(text, position + 1)
+            continue
+        start, done = match.span()
+        # The reversal left the cluster backwards at size - done
+        output[4 * (size - done):4 * (size - start)] = source[4 * start:4 * done]
+        found = joiners.search(text, done)
+    return output.decode('utf-32-le', 'surrogatepass')
+
+def blocks_backwards(data, block_size=BLOCK_SIZE):
+    """Yields blocks of a UTF-8 buffer from the end to the start, each beginning on a character boundary."""
+    for start, end in text_tokens.blocks(data, block_size, backwards=True):
+        yield data[start:end]
+
+def map_file(file):
+    """Returns a read-only mmap of an open file, or b'' for an empty one (which mmap refuses)."""
+    if os.fstat(file.fileno()).st_size == 0:
+        return b''
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+def open_output(output_path):
+    """Opens output_path for buffered binary writing; '-' or None means stdout."""
+    if output_path in (None, '-'):
+        return open(sys.stdout.fileno(), 'wb', buffering=BLOCK_SIZE, closefd=False)
+    return open(output_path, 'wb', buffering=BLOCK_SIZE)
+
+def reversed_character_blocks(data, block_size=BLOCK_SIZE):
+    """Yields the characters of a UTF-8 buffer in reverse order, as encoded blocks.
+    
+    The buffer is read one block at a time from the end, so memory use stays
+    at about one block whatever its size. Line endings are reversed as they
+    are (CR LF comes out as LF CR) and undecodable bytes are passed through
+    unchanged.
+    """
+    for block in blocks_backwards(data, block_size):
+        text = block.decode('utf-8', 'surrogateescape')
+        yield text[::-1].encode('utf-8', 'surrogateescape')
+
+def reversed_grapheme_blocks(data, block_size=BLOCK_SIZE):
+    """Yields the grapheme clusters of a UTF-8 buffer in reverse order, as encoded blocks.
+    
+    Works like reversed_character_blocks, except that the characters at the
+    start of a block that may belong to a cluster begun in the block before
+    are carried over to it.
+    """
+    starts = grapheme_patterns()[2]
+    carry = ''
+    for block in blocks_backwards(data, block_size):
+        text = block.decode('utf-8', 'surrogateescape') + carry
+        match = starts.search(text, 1)
+        if match is None:
+            carry = text
+            continue
+        carry = text[:match.start()]
+        yield reverse_grapheme_order(text[match.start():]).encode('utf-8', 'surrogateescape')
+    if carry:
+        yield reverse_grapheme_order(carry).encode('utf-8', 'surrogateescape')
+
+# The transforms by name, applied to a string and streamed over a whole document
+TRANSFORMS = {'characters': reverse_character_order, 'words': reverse_word_order,
+              'graphemes': reverse_grapheme_order}
+DOCUMENT_TRANSFORMS = {'characters': reversed_character_blocks, 'words': text_tokens.reversed_words,
+                       'graphemes': reversed_grapheme_blocks}
+
+@contextlib.contextmanager
+def open_document(input_path):
+    """Gives the bytes of a whole input: a read-only mmap of a file, or all of standard input for '-'."""
+    if input_path == '-':
+        # A pipe cannot be mapped, so standard input is read whole
+        yield sys.stdin.buffer.read()
+        return
+    with open(input_path, 'rb') as file:
+        data = map_file(file)
+        try:
+            yield data
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+def reverse_document(input_path, output, transform, block_size=BLOCK_SIZE):
+    """Writes a whole file, transformed, to a binary stream; '-' reads standard input."""
+    with open_document(input_path) as data:
+        output.writelines(DOCUMENT_TRANSFORMS[transform](data, block_size))
+
+def reverse_file_characters(input_path, output_path, block_size=BLOCK_SIZE):
+    """Writes the characters of a UTF-8 file in reverse order, like reverse_character_order on its text."""
+    with open_output(output_path) as output:
+        reverse_document(input_path, output, 'characters', block_size)
+
+def reverse_file_words(input_path, output_path, block_size=BLOCK_SIZE):
+    """Writes the words of a UTF-8 file in reverse order, like reverse_word_order on its text."""
+    with open_output(output_path) as output:
+        reverse_document(input_path, output, 'words', block_size)
+
+def read_chunks(stream, per='line', chunk_size=CHUNK_SIZE):
+    """Yields pieces of about chunk_size bytes of a binary stream, each ending on a line or paragraph boundary.
+    
+    A piece grows until a boundary is found, so a single line or paragraph
+    longer than chunk_size is held in memory whole. It grows in place and
+    only the data just read is searched, so even an input with no boundary,
+    or no newline, at all costs time linear in its size. Paragraphs are cut before blank
+    or whitespace-only lines, which paragraphs() also treats as separators.
+    """
+    spaces = b' \t\r\f\v'
+    pending = bytearray()
+    # The last newline in pending, and whether only spaces follow it, so
+    # that a blank line begun in one read and ended in the next is found
+    # without searching the earlier read again
+    last_newline, blank_tail = -1, False
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        searched = len(pending)
+        pending += data
+        if per == 'line':
+            cut = pending.rfind(b'\n', searched) + 1
+        else:
+            cut = 0
+            if blank_tail:
+                end = pending.find(b'\n', searched)
+                if end >= 0 and not pending[searched:end].strip(spaces):
+                    cut = last_newline + 1
+            for match in PARAGRAPH_BREAK.finditer(pending, searched):
+                cut = match.start() + 1
+        newline = pending.rfind(b'\n', searched)
+        if newline >= 0:
+            last_newline = newline
+            blank_tail = not pending[newline + 1:].strip(spaces)
+        else:
+            blank_tail = blank_tail and not data.strip(spaces)
+        if cut:
+            with memoryview(pending) as view:
+                piece = bytes(view[:cut])
+            del pending[:cut]
+            yield piece
+            last_newline -= cut
+            blank_tail = blank_tail and last_newline >= 0
+    if pending:
+        yield bytes(pending)
+
+def paragraphs(lines):
+    """Yields the runs of non-blank lines in a list of lines, each joined with newlines."""
+    paragraph = []
+    for line in lines:
+        if line.strip():
+            paragraph.append(line)
+        elif paragraph:
+            yield '\n'.join(paragraph)
+            paragraph = []
+    if paragraph:
+        yield '\n'.join(paragraph)
+
+def transform_chunk(task):
+    """Applies a transform to each line or paragraph of a chunk from read_chunks, returning the output bytes.
+    
+    Lines may end in LF or CR LF and come out ending in LF; paragraphs come
+    out separated by one blank line. Each line or paragraph is passed to the
+    same function the interactive menu uses.
+    """
+    chunk, transform, per = task
+    if per == 'line' and transform == 'words':
+        # With all whitespace made spaces, bytes.split() finds the same words
+        # as str.split() on the decoded line, so the chunk is never decoded
+        lines = text_tokens.blank_whitespace(chunk).split(b'\n')
+        if chunk.endswith(b'\n'):
+            lines.pop()
+        return b''.join([b' '.join(reversed(line.split())) + b'\n' for line in lines])
+    function = TRANSFORMS[transform]
+    text = chunk.decode('utf-8', 'surrogateescape')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n')
+    if text.endswith('\n'):
+        text = text[:-1]
+    if per == 'line' and function is reverse_character_order:
+        # Reversing the whole chunk reverses every line and the order of the
+        # lines; putting the lines back in order gives each line reversed,
+        # without a function call per line
+        return ('\n'.join(reversed(text[::-1].split('\n'))) + '\n').encode('utf-8', 'surrogateescape')
+    lines = text.split('\n')
+    if per == 'line':
+        return ('\n'.join(map(function, lines)) + '\n').encode('utf-8', 'surrogateescape')
+    text = '\n\n'.join(map(function, paragraphs(lines)))
+    return (text + '\n').encode('utf-8', 'surrogateescape') if text else b''
+
+def ordered_map(function, tasks, jobs=None):
+    """Like map(), but over a process pool, keeping a few tasks per worker in flight (jobs=1 runs serially)."""
+    if jobs == 1:
+        yield from map(function, tasks)
+        return
+    workers = jobs or os.cpu_count() or 1
+    with multiprocessing.Pool(workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.apply_async(function, (task,)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+def run_pipeline(input_paths, output, transform, per='line', jobs=None, chunk_size=CHUNK_SIZE, stats=False):
+    """Transforms every line, paragraph or whole document of the inputs, writing to one binary stream.
+    
+    The path '-' is standard input. Lines and paragraphs are sent to a process
+    pool in chunks of about chunk_size bytes and written back in input order;
+    with a bounded number of chunks in flight, memory does not grow with the
+    input. Documents are streamed one at a time and separated by a newline.
+    
+    With stats (only for words per document), returns the text_tokens.WordStats
+    of each input, taken in the same pass that reverses it.
+    """
+    if stats:
+        if (transform, per) != ('words', 'document'):
+            raise ValueError("word statistics need the words transform per document")
+        results = []
+        for index, path in enumerate(input_paths):
+            if index:
+                output.write(b'\n')
+            with open_document(path) as data:
+                results.append(text_tokens.scan_words(data, output))
+        return results
+    if per == 'document':
+        for index, path in enumerate(input_paths):
+            if index:
+                output.write(b'\n')
+            reverse_document(path, output, transform)
+        return
+    
+    def tasks():
+        for path in input_paths:
+            if path == '-':
+                for chunk in read_chunks(sys.stdin.buffer, per, chunk_size):
+                    yield chunk, transform, per
+                continue
+            with open(path, 'rb') as stream:
+                for chunk in read_chunks(stream, per, chunk_size):
+                    yield chunk, transform, per
+    
+    # A paragraph output chunk ends in a single newline, so add the blank line between chunks
+    separator = b'\n' if per == 'paragraph' else b''
+    wrote = False
+    for result in ordered_map(transform_chunk, tasks(), jobs):
+        if result:
+            if wrote:
+                output.write(separator)
+            output.write(result)
+            wrote = True
+
+def benchmark_reversal(size=1 << 20, repeat=5):
+    """Times reverse_grapheme_order against plain slicing on about size bytes of different kinds of text."""
+    sentence = "Dès Noël où un zéphyr haï me vêt de glaçons würmiens, "
+    samples = {
+        'ASCII': "The quick brown fox jumps over the lazy dog. ",
+        'accents, precomposed': sentence,
+        'accents, combining': unicodedata.normalize('NFD', sentence),
+        'emoji': "Family 👨‍👩‍👧 thumbs 👍🏽 flag 🇫🇷 ",
+    }
+    grapheme_patterns()
+    print(f"{'text':<22}{'slicing':>12}{'graphemes':>12}{'ratio':>8}")
+    for name, sample in samples.items():
+        text = sample * (size // len(sample.encode()) + 1)
+        best = []
+        for function in (reverse_character_order, reverse_grapheme_order):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                function(text)
+                timings.append(time.perf_counter() - start)
+            best.append(min(timings))
+        print(f"{name:<22}{best[0] * 1000:>10.2f}ms{best[1] * 1000:>10.2f}ms{best[1] / best[0]:>7.1f}x")
+
+def pipeline_main(argv=None):
+    """Command-line entry point for reversing files without the menu; returns the exit status."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Reverse the characters or words of files or standard input. "
+                                                 "Runs the interactive menu when no argument is given.")
+    parser.add_argument('transform', nargs='?', choices=sorted(TRANSFORMS),
+                        help="what to reverse; graphemes keeps accented letters and emoji whole")
+    parser.add_argument('inputs', nargs='*', default=['-'], metavar='INPUT',
+                        help="UTF-8 text files; '-' or none reads standard input")
+    parser.add_argument('--per', choices=['line', 'paragraph', 'document'], default='document',
+                        help="reverse within each line, each paragraph or the whole input (default: document)")
+    parser.add_argument('-j', '--jobs', type=int, help="worker processes for --per line/paragraph (default: one per CPU)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, metavar='BYTES',
+                        help=f"bytes of input per worker task (default: {CHUNK_SIZE})")
+    parser.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+    parser.add_argument('--stats', action='store_true',
+                        help="with words per document, also print word counts and lengths to stderr")
+    parser.add_argument('--benchmark', action='store_true', help="time grapheme reversal against slicing")
+    args = parser.parse_args(argv)
+    
+    if args.benchmark:
+        benchmark_reversal()
+        return 0
+    if args.transform is None:
+        parser.error("the transform is required")
+    if args.chunk_size <= 0 or (args.jobs is not None and args.jobs <= 0):
+        parser.error("--chunk-size and --jobs must be positive")
+    if args.stats and (args.transform, args.per) != ('words', 'document'):
+        parser.error("--stats needs the words transform and --per document")
+    try:
+        with open_output(args.output) as output:
+            results = run_pipeline(args.inputs, output, args.transform, args.per, args.jobs, args.chunk_size,
+                                   args.stats)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    for path, stats in zip(args.inputs, results or []):
+        mean = stats.word_bytes / stats.words if stats.words else 0
+        print(f"{path}: {stats.words} words, {stats.lines} lines, {stats.bytes} bytes, "
+              f"mean word {mean:.1f} bytes, longest {stats.longest} bytes", file=sys.stderr)
+    return 0
+
 def save_to_file(reversed_text):
     """Saves the reversed text to a file."""
     with open('reversed_text.txt', 'w') as file:
@@ -21,8 +524,9 @@ def main():
         print("1. Reverse Character Order")
         print("2. Reverse Word Order")
         print("3. Exit")
+        print("4. Reverse Character Order (keep accents and emoji together)")
         
-        choice = input("Choose an option (1-3): ")
+        choice = input("Choose an option (1-4): ")
         
         if choice == '3':
             print("Exiting the program. Goodbye!")
@@ -40,8 +544,11 @@ def main():
         elif choice == '2':
             reversed_text = reverse_word_order(text)
             print(f"Reversed Word Order: {reversed_text}")
+        elif choice == '4':
+            reversed_text = reverse_grapheme_order(text)
+            print(f"Reversed Grapheme Order: {reversed_text}")
         else:
-            print("Invalid choice. Please select 1 or 2.")
+            print("Invalid choice. Please select 1, 2 or 4.")
             continue
         
         save_option = input("Would you like to save the reversed text to a file? (yes/no): ").strip().lower()
@@ -49,4 +556,7 @@ def main():
             save_to_file(reversed_text)
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        sys.exit(pipeline_main())
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,358 @@
+"""Headless benchmark suite and regression check for the five projects.
+
+Every case runs in a fresh interpreter, so its peak resident set size is its
+own and no case warms caches for the next. Results are written as JSON with,
+for each case and size, the throughput in items per second, the p50 and p99
+latency of one timed call and the peak RSS. Given a baseline from an earlier
+run, cases whose throughput dropped or whose memory grew by more than the
+threshold are listed as regressions and the exit status is 1.
+
+Throughput depends on the machine, so no baseline is kept in the repository.
+Record one on your machine from the revision you are comparing against, then
+run the changed tree against it:
+
+    git checkout main
+    python benchmark_suite.py --quick -o baseline.json
+    git checkout my-branch
+    python benchmark_suite.py --quick --baseline baseline.json --threshold 0.2
+
+Nothing needs a display or the network. The expense summary cases run the
+menu options themselves and so need tabulate; optional packages (NumPy for
+the expense index) are used when installed, as by the projects themselves.
+"""
+import argparse
+import contextlib
+import fnmatch
+import importlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+try:
+    import resource
+except ImportError:
+    # Windows has no getrusage; peak RSS is then reported as null
+    resource = None
+
+USERNAMES = "PYTHON_PROGRAMMING_INTERNSHIP_PROJECT_1"
+WORD_COUNTER = "PYTHON_PROGRAMMING_INTERNSHIP_PROJECT_2"
+EXPENSES = "PYTHON_PROGRAMMING_INTERNSHIP_PROJECT_3"
+COIN_TOSS = "PYTHON_PROGRAMMING_INTERNSHIP_PROJECT_4"
+REVERSER = "PYTHON_PROGRAMMING_INTERNSHIP_PROJECT_5"
+
+# name -> (function, unit, sizes, quick sizes). The function takes a size and
+# returns one (seconds, items) pair per timed call.
+CASES = {}
+
+
+def benchmark(name, unit, sizes, quick_sizes):
+    """Register a benchmark case under name."""
+    def register(function):
+        CASES[name] = (function, unit, sizes, quick_sizes)
+        return function
+    return register
+
+
+def timed_calls(operation, calls, items_per_call):
+    """Call operation calls times, returning (seconds, items) for each call."""
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - start, items_per_call))
+    return samples
+
+
+def call_count(size, budget=10_000_000, most=1000, least=5):
+    """Number of calls for an operation on size items: more for small sizes, so each case takes similar time."""
+    return max(least, min(most, budget // max(size, 1)))
+
+
+def synthetic_text(words, seed=0):
+    """Return about words words of text in lines of twelve, for the text benchmarks."""
+    rng = random.Random(seed)
+    vocabulary = ["the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "naïve", "café", "€100", "data"]
+    picked = rng.choices(vocabulary, k=words)
+    return "\n".join(" ".join(picked[i:i + 12]) for i in range(0, words, 12))
+
+
+def quietly(function, *args):
+    """Call function with its progress messages on stdout discarded, so they do not mix with the JSON."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+
+def answering(function, answers):
+    """Call function quietly, giving the next of answers to each input() prompt."""
+    with mock.patch("builtins.input", lambda prompt="": next(answers)):
+        return quietly(function)
+
+
+@benchmark("usernames.generate_username", "names", [10_000, 1_000_000], [10_000])
+def bench_generate_username(size):
+    project = importlib.import_module(USERNAMES)
+    generator = project.UsernameGenerator()
+    random.seed(0)
+    batch = min(size, 1000)
+
+    def generate():
+        for _ in range(batch):
+            generator.generate_username()
+    return timed_calls(generate, max(1, size // batch), batch)
+
+
+@benchmark("usernames.save_usernames", "names", [10_000, 1_000_000], [10_000])
+def bench_save_usernames(size):
+    project = importlib.import_module(USERNAMES)
+    generator = project.UsernameGenerator()
+    names = generator.generate_many(size, unique=False, seed=0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "usernames.txt")
+        return timed_calls(lambda: generator.save_usernames(names, path), call_count(size), size)
+
+
+@benchmark("words.count_words", "words", [1_000, 100_000, 10_000_000], [1_000, 100_000])
+def bench_count_words(size):
+    project = importlib.import_module(WORD_COUNTER)
+    text = synthetic_text(size)
+    return timed_calls(lambda: project.count_words(text), call_count(size), size)
+
+
+@benchmark("reverser.reverse_character_order", "words", [1_000, 100_000, 10_000_000], [1_000, 100_000])
+def bench_reverse_character_order(size):
+    project = importlib.import_module(REVERSER)
+    text = synthetic_text(size)
+    return timed_calls(lambda: project.reverse_character_order(text), call_count(size), size)
+
+
+@benchmark("reverser.reverse_word_order", "words", [1_000, 100_000, 10_000_000], [1_000, 100_000])
+def bench_reverse_word_order(size):
+    project = importlib.import_module(REVERSER)
+    text = synthetic_text(size)
+    return timed_calls(lambda: project.reverse_word_order(text), call_count(size), size)
+
+
+def write_ledger(path, size):
+    project = importlib.import_module(EXPENSES)
+    log = project.ExpenseLog(path)
+    log.compact(project.synthetic_expenses(size))
+    log.close()
+
+
+def expense_ledger(project, directory, size):
+    """Write a synthetic ledger of size expenses to directory and return its name.
+
+    The ledger is written by another process, so the list of synthetic
+    expenses does not count towards the peak RSS of the case.
+    """
+    writer = multiprocessing.Process(target=write_ledger, args=(os.path.join(directory, "benchmark.jsonl"), size))
+    writer.start()
+    writer.join()
+    if writer.exitcode:
+        raise RuntimeError(f"writing the benchmark ledger failed with exit status {writer.exitcode}")
+    return "benchmark"
+
+
+@benchmark("expenses.load", "rows", [1_000, 10_000, 100_000, 1_000_000], [1_000, 10_000])
+def bench_expenses_load(size):
+    project = importlib.import_module(EXPENSES)
+    with tempfile.TemporaryDirectory() as directory:
+        ledger = expense_ledger(project, directory, size)
+        return timed_calls(lambda: quietly(project.ExpenseTracker, ledger, directory).log.close(),
+                           call_count(size, budget=1_000_000, most=50, least=3), size)
+
+
+@benchmark("expenses.save", "rows", [1_000, 10_000, 100_000, 1_000_000], [1_000, 10_000])
+def bench_expenses_save(size):
+    project = importlib.import_module(EXPENSES)
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = quietly(project.ExpenseTracker, expense_ledger(project, directory, size), directory)
+        samples = timed_calls(lambda: quietly(tracker.save_expenses),
+                              call_count(size, budget=1_000_000, most=50, least=3), size)
+        tracker.log.close()
+        return samples
+
+
+@benchmark("expenses.index_build", "rows", [1_000, 10_000, 100_000, 1_000_000], [1_000, 10_000])
+def bench_expenses_index_build(size):
+    # The one-off cost behind the first monthly summary or category analysis
+    project = importlib.import_module(EXPENSES)
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = quietly(project.ExpenseTracker, expense_ledger(project, directory, size), directory)
+        samples = timed_calls(lambda: project.ExpenseIndex(tracker.expenses),
+                              call_count(size, budget=1_000_000, most=50, least=3), size)
+        tracker.log.close()
+        return samples
+
+
+@benchmark("expenses.monthly_summary", "summaries", [1_000, 10_000, 100_000, 1_000_000], [1_000, 10_000])
+def bench_expenses_monthly_summary(size):
+    # The menu option itself, choosing each month in turn and declining the chart
+    project = importlib.import_module(EXPENSES)
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = quietly(project.ExpenseTracker, expense_ledger(project, directory, size), directory)
+        # Built here: the first summary's index build is timed by expenses.index_build
+        months = sorted(tracker.index.month_totals)
+        answers = itertools.cycle(itertools.chain.from_iterable((month, "n") for month in months))
+        samples = timed_calls(lambda: answering(tracker.monthly_summary, answers), 1000, 1)
+        tracker.log.close()
+        return samples
+
+
+@benchmark("expenses.category_analysis", "analyses", [1_000, 10_000, 100_000, 1_000_000], [1_000, 10_000])
+def bench_expenses_category_analysis(size):
+    # The menu option itself, declining the chart
+    project = importlib.import_module(EXPENSES)
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = quietly(project.ExpenseTracker, expense_ledger(project, directory, size), directory)
+        # Built here: the first analysis's index build is timed by expenses.index_build
+        tracker.index
+        samples = timed_calls(lambda: answering(tracker.category_analysis, itertools.repeat("n")), 1000, 1)
+        tracker.log.close()
+        return samples
+
+
+@benchmark("coin_toss.run", "flips", [1_000, 100_000, 10_000_000, 100_000_000], [1_000, 100_000, 1_000_000])
+def bench_coin_toss(size):
+    project = importlib.import_module(COIN_TOSS)
+    engine = project.CoinTossEngine(seed=0)
+    return timed_calls(lambda: engine.run(size), call_count(size, budget=100_000_000, least=3), size)
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of a sorted list."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB, or None where it cannot be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+def run_case(name, size):
+    """Run one case in this process and return its result."""
+    function, unit, _, _ = CASES[name]
+    samples = function(size)
+    seconds = sorted(elapsed for elapsed, _ in samples)
+    items = sum(count for _, count in samples)
+    return {
+        "name": name,
+        "size": size,
+        "unit": unit,
+        "calls": len(samples),
+        "ops_per_sec": round(items / sum(seconds), 1) if sum(seconds) else None,
+        "p50_ms": round(percentile(seconds, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(seconds, 0.99) * 1000, 4),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_isolated(name, size):
+    """Run one case in a fresh interpreter and return its result, or a result holding the error."""
+    command = [sys.executable, os.path.abspath(__file__), "--child", name, str(size)]
+    completed = subprocess.run(command, capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    if completed.returncode == 0:
+        return json.loads(completed.stdout.splitlines()[-1])
+    lines = completed.stderr.strip().splitlines()
+    return {"name": name, "size": size, "error": lines[-1] if lines else f"exit status {completed.returncode}"}
+
+
+def compare(results, baseline, threshold):
+    """Return a line for every result that regressed from the baseline by more than threshold (a fraction)."""
+    previous = {(result["name"], result["size"]): result for result in baseline.get("results", [])
+                if "error" not in result}
+    regressions = []
+    for result in results:
+        old = previous.get((result["name"], result["size"]))
+        if old is None or "error" in result:
+            continue
+        label = f"{result['name']} [{result['size']:,}]"
+        if old["ops_per_sec"] and result["ops_per_sec"] < old["ops_per_sec"] * (1 - threshold):
+            regressions.append(f"{label}: {old['ops_per_sec']:,.0f} -> {result['ops_per_sec']:,.0f} "
+                               f"{result['unit']}/s ({result['ops_per_sec'] / old['ops_per_sec'] - 1:+.0%})")
+        if old.get("peak_rss_mb") and result.get("peak_rss_mb") and \
+                result["peak_rss_mb"] > old["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{label}: peak RSS {old['peak_rss_mb']} -> {result['peak_rss_mb']} MiB")
+    return regressions
+
+
+def main(argv=None):
+    """Command-line entry point; returns the exit status."""
+    parser = argparse.ArgumentParser(description="Benchmark all five projects and check for regressions.")
+    parser.add_argument("--quick", action="store_true", help="run only the small sizes (about a minute)")
+    parser.add_argument("--case", action="append", metavar="PATTERN",
+                        help="run only cases matching this glob pattern (repeatable), e.g. 'expenses.*'")
+    parser.add_argument("--list", action="store_true", help="list the cases and their sizes")
+    parser.add_argument("-o", "--output", metavar="FILE", help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against results saved by an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="fraction of throughput lost or memory gained that counts as a regression (default: 0.2)")
+    parser.add_argument("--child", nargs=2, metavar=("CASE", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_case(args.child[0], int(args.child[1]))))
+        return 0
+    selected = [name for name in CASES
+                if not args.case or any(fnmatch.fnmatch(name, pattern) for pattern in args.case)]
+    if args.list:
+        for name in selected:
+            _, unit, sizes, quick_sizes = CASES[name]
+            print(f"{name:<36} {unit:<10} sizes {sizes}, quick {quick_sizes}")
+        return 0
+    if not selected:
+        parser.error("no case matches --case")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    results = []
+    for name in selected:
+        _, _, sizes, quick_sizes = CASES[name]
+        for size in quick_sizes if args.quick else sizes:
+            result = run_isolated(name, size)
+            results.append(result)
+            if "error" in result:
+                print(f"{name} [{size:,}]: failed: {result['error']}", file=sys.stderr)
+            else:
+                print(f"{name} [{size:,}]: {result['ops_per_sec']:,.0f} {result['unit']}/s, "
+                      f"p50 {result['p50_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms, "
+                      f"peak {result['peak_rss_mb']} MiB", file=sys.stderr)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "quick": args.quick,
+        "results": results,
+    }
+    if baseline is not None:
+        report["threshold"] = args.threshold
+        report["regressions"] = compare(results, baseline, args.threshold)
+        for line in report["regressions"]:
+            print(f"REGRESSION {line}", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Crash recovery and multi-writer tests for the expense journal (project 3).
+
+Run with: python -m unittest test_expense_log (or pytest).
+"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from PYTHON_PROGRAMMING_INTERNSHIP_PROJECT_3 import ChartRenderer, ExpenseLog, ExpenseTracker
+
+
+def expense(amount, description="test"):
+    return {"date": "2024-05-01", "amount": amount, "description": description, "category": "Food"}
+
+
+class ExpenseLogTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "ledger.jsonl")
+
+    def tracker(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker = ExpenseTracker("ledger", self.directory.name)
+        self.addCleanup(tracker.log.close)
+        return tracker
+
+    def add(self, tracker, amount):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(tracker.record_change("add", expense(amount)))
+
+    def amounts(self):
+        log = ExpenseLog(self.path)
+        try:
+            return [row["amount"] for row in log.load()]
+        finally:
+            log.close()
+
+    def tear(self):
+        """Leave a partial record, as a writer that crashed mid-append would."""
+        with open(self.path, 'ab') as file:
+            file.write(b'{"op": "add", "expense": {"date": "2024-')
+
+    def test_load_drops_torn_record(self):
+        self.add(self.tracker(), 1.0)
+        self.tear()
+        self.assertEqual(self.amounts(), [1.0])
+        with open(self.path, 'rb') as file:
+            self.assertTrue(file.read().endswith(b"\n"))
+
+    def test_append_after_torn_record_is_kept(self):
+        first, second = self.tracker(), self.tracker()
+        self.add(first, 1.0)
+        second.refresh()
+        self.tear()
+        self.add(second, 2.0)
+        self.assertEqual(self.amounts(), [1.0, 2.0])
+
+    def test_journal_stays_readable_after_torn_record(self):
+        first, second = self.tracker(), self.tracker()
+        self.add(first, 1.0)
+        second.refresh()
+        self.tear()
+        self.add(second, 2.0)
+        self.add(second, 3.0)
+        self.add(first, 4.0)
+        self.assertEqual(self.amounts(), [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual([row["amount"] for row in first.expenses], [1.0, 2.0, 3.0, 4.0])
+
+    def test_writers_see_each_others_records(self):
+        first, second = self.tracker(), self.tracker()
+        self.add(first, 1.0)
+        self.add(second, 2.0)
+        self.add(first, 3.0)
+        self.assertEqual([row["id"] for row in first.expenses], [1, 2, 3])
+        second.refresh()
+        self.assertEqual([row["amount"] for row in second.expenses], [1.0, 2.0, 3.0])
+
+    def test_writer_reloads_after_another_compacts(self):
+        first, second = self.tracker(), self.tracker()
+        self.add(first, 1.0)
+        self.add(second, 2.0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            second.save_expenses()
+        self.add(first, 3.0)
+        self.assertEqual(self.amounts(), [1.0, 2.0, 3.0])
+
+    def test_compaction_waits_for_journal_to_outgrow_ledger(self):
+        log = ExpenseLog(self.path, compact_after=10)
+        self.addCleanup(log.close)
+        edited = dict(log.compact([expense(float(amount)) for amount in range(100)])[0], amount=0.5)
+        for _ in range(99):
+            log.edit(edited)
+            self.assertFalse(log.needs_compaction(100))
+        log.edit(edited)
+        self.assertTrue(log.needs_compaction(100))
+
+    def test_position_of_leaves_snapshot_rows_in_place(self):
+        log = ExpenseLog(self.path)
+        self.addCleanup(log.close)
+        log.compact([expense(float(amount)) for amount in range(5)])
+        log.add(expense(5.0))
+        expenses = log.load()
+        self.assertEqual([expenses.position_of(expense_id) for expense_id in range(8)], [None, 0, 1, 2, 3, 4, 5, None])
+        self.assertIsNone(expenses.rows)
+        del expenses[1]
+        self.assertEqual([expenses.position_of(expense_id) for expense_id in range(8)], [None, 0, None, 1, 2, 3, 4, None])
+
+    def test_new_chart_replaces_older_ones_of_its_period(self):
+        renderer = ChartRenderer(self.directory.name)
+        names = ["2024-05-" + "a" * 20 + ".png", "2024-05-" + "b" * 20 + ".png", "2024-05-" + "a" * 20 + ".svg",
+                 "2024-06-" + "a" * 20 + ".png", "2024-05-01-" + "a" * 20 + ".png"]
+        for name in names:
+            open(os.path.join(self.directory.name, name), 'w').close()
+        renderer.remove_stale(os.path.join(self.directory.name, names[1]))
+        self.assertEqual(sorted(os.listdir(self.directory.name)), sorted(names[1:]))
+
+
+if __name__ == "__main__":
+    unittest.main()
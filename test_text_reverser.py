@@ -0,0 +1,82 @@
+"""Tests for the text reverser (project 5).
+
+Run with: python -m unittest test_text_reverser (or pytest).
+"""
+import io
+import time
+import unittest
+
+from PYTHON_PROGRAMMING_INTERNSHIP_PROJECT_5 import read_chunks, reverse_grapheme_order, reversed_grapheme_blocks
+
+# Strings split into their extended grapheme clusters by the rules of UAX #29
+CLUSTERS = {
+    "CR LF": ["a", "\r\n", "b"],
+    "LF CR": ["\n", "\r"],
+    "control then mark": ["\x00", "\u0308"],
+    "combining marks": ["e\u0301\u0323", "x"],
+    "L V T": ["\u1100\u1161\u11a8"],
+    "L LV": ["\u1100\uac00"],
+    "LV V T": ["\uac00\u1161\u11a8"],
+    "LVT V": ["\ud55c", "\u1161"],
+    "LVT T": ["\ud55c\u11ab"],
+    "T L": ["\u11a8", "\u1100"],
+    "flags": ["\U0001f1eb\U0001f1f7", "\U0001f1fa\U0001f1f8"],
+    "odd regional indicator": ["a", "\U0001f1eb\U0001f1f7", "\U0001f1fa"],
+    "ZWJ family": ["\U0001f468\u200d\U0001f469\u200d\U0001f467"],
+    "ZWJ after letter": ["a\u200d", "\U0001f600"],
+    "modifier": ["\U0001f44d\U0001f3fd", "!"],
+    "modifiers and marks before ZWJ": ["\U0001f476\U0001f3ff\u0308\u200d\U0001f476\U0001f3ff"],
+    "variation selector": ["\u2764\ufe0f", "\u2764"],
+    "spacing mark": ["\u0915\u093f", "\u0915"],
+    "prepend": ["\u0600\u0661", "2"],
+    "prepend before control": ["\u0600", "\n"],
+}
+
+
+class GraphemeTest(unittest.TestCase):
+    def test_clusters_are_kept_whole(self):
+        for name, clusters in CLUSTERS.items():
+            with self.subTest(name):
+                self.assertEqual(reverse_grapheme_order("".join(clusters)), "".join(reversed(clusters)))
+
+    def test_plain_text_is_sliced(self):
+        for text in ["", "abc def", "Noël à Paris"]:
+            self.assertEqual(reverse_grapheme_order(text), text[::-1])
+
+    def test_blocks_match_whole_text(self):
+        text = "".join(cluster for clusters in CLUSTERS.values() for cluster in clusters)
+        data = text.encode("utf-8")
+        for block_size in (4, 5, 7, 64):
+            with self.subTest(block_size=block_size):
+                self.assertEqual(b"".join(reversed_grapheme_blocks(data, block_size)),
+                                 reverse_grapheme_order(text).encode("utf-8"))
+
+
+class ReadChunksTest(unittest.TestCase):
+    def test_chunks_end_at_boundaries(self):
+        data = b"one\ntwo\n \t\nthree\n\nfour\n  \n\nfive"
+        # Offsets just after each newline, and after those before a blank line
+        boundaries = {"line": {4, 8, 11, 17, 18, 23, 26, 27},
+                      "paragraph": {8, 17, 23, 26}}
+        for per, cuts in boundaries.items():
+            for chunk_size in (1, 2, 3, 64):
+                with self.subTest(per=per, chunk_size=chunk_size):
+                    chunks = list(read_chunks(io.BytesIO(data), per, chunk_size))
+                    self.assertEqual(b"".join(chunks), data)
+                    ends = {sum(map(len, chunks[:i + 1])) for i in range(len(chunks) - 1)}
+                    self.assertLessEqual(ends, cuts)
+                    if chunk_size == 1:
+                        self.assertEqual(ends, cuts)
+
+    def test_input_without_newline_is_read_in_linear_time(self):
+        data = b"x" * (16 << 20)
+        for per in ("line", "paragraph"):
+            with self.subTest(per=per):
+                start = time.perf_counter()
+                chunks = list(read_chunks(io.BytesIO(data), per, 1024))
+                self.assertLess(time.perf_counter() - start, 1.0)
+                self.assertEqual(chunks, [data])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+"""Frequency report tests for the word counter (project 2).
+
+Run with: python -m unittest test_word_counter (or pytest).
+"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from PYTHON_PROGRAMMING_INTERNSHIP_PROJECT_2 import approximate_frequencies, wc_main, word_frequencies
+
+
+class FrequencyTest(unittest.TestCase):
+    def test_ngrams_stay_within_each_input(self):
+        for analyse in (word_frequencies, approximate_frequencies):
+            with self.subTest(analyse.__name__):
+                report = analyse([io.BytesIO(b"a b c"), io.BytesIO(b"d e")], ngram=2)
+                self.assertEqual(report.terms, 3)
+                self.assertEqual(sorted(report.top), [(("a", "b"), 1), (("b", "c"), 1), (("d", "e"), 1)])
+
+    def test_bigrams_across_two_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, name) for name in ("first.txt", "second.txt")]
+            for path, text in zip(paths, (b"red fish\nblue", b"fish red fish")):
+                with open(path, "wb") as file:
+                    file.write(text)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(wc_main(["--top", "10", "--ngram", "2"] + paths), 0)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], "Terms: 4")
+        counts = {term: int(count) for count, term in (line.split(None, 1) for line in lines[2:])}
+        self.assertEqual(counts, {"red fish": 2, "fish blue": 1, "fish red": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""Word spans over UTF-8 bytes, shared by the word counter and the text reverser.
+
+A word is what str.split() returns from the decoded text: a run of anything
+but whitespace, where undecodable bytes count as part of a word. Words are
+found on the undecoded bytes of a bytes object, bytearray or mmap and
+reported as (start, end) byte offsets by word_spans, so no word is decoded
+or copied unless the caller asks for its bytes. Bulk consumers use the
+word marks (for counting) or whole blocks split at once (for the words
+themselves), which find the same words.
+"""
+
+import mmap
+import re
+from collections import namedtuple
+
+# Bytes of a buffer handled at a time
+BLOCK_SIZE = 1 << 20
+
+# Every code point that str.split() treats as whitespace, as UTF-8 bytes.
+# The ASCII ones are mapped to a space byte by a translate table; the
+# multi-byte ones are blanked out with as many spaces before translating,
+# so that offsets into the marks are offsets into the text.
+ASCII_WHITESPACE = b"\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f "
+MULTIBYTE_WHITESPACE = [char.encode() for char in
+                        "\x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006"
+                        "\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000"]
+# Whitespace becomes b" " and everything else b"x", so every word start is a b" x" pair
+WORD_TABLE = bytes(0x20 if byte in ASCII_WHITESPACE else 0x78 for byte in range(256))
+WORD_MARKS = re.compile(rb"x+")
+# The ASCII whitespace that bytes.split() does not split on, mapped to spaces
+SPACE_TABLE = bytes.maketrans(b"\x1c\x1d\x1e\x1f", b"    ")
+
+# Totals from one pass over a buffer: words, newlines and bytes as counted by
+# wc, the bytes inside words and the length in bytes of the longest word
+WordStats = namedtuple("WordStats", ["words", "lines", "bytes", "word_bytes", "longest"])
+
+def blank_multibyte(chunk):
+    """Return chunk with every multi-byte whitespace character replaced by as many spaces."""
+    if not chunk.isascii():
+        for whitespace in MULTIBYTE_WHITESPACE:
+            if whitespace in chunk:
+                chunk = chunk.replace(whitespace, b" " * len(whitespace))
+    return chunk
+
+def blank_whitespace(chunk):
+    """Return chunk with whitespace replaced by spaces, so that bytes.split() splits it as str.split() does the text."""
+    return blank_multibyte(chunk).translate(SPACE_TABLE)
+
+def word_marks(chunk):
+    """Return chunk with every byte of a word replaced by b"x" and every whitespace byte by b" "."""
+    return blank_multibyte(chunk).translate(WORD_TABLE)
+
+def blocks(data, block_size=BLOCK_SIZE, backwards=False):
+    """Yield (start, end) offsets splitting a UTF-8 buffer into blocks that begin on character boundaries.
+
+    Blocks come from the end to the start when backwards is true. The pages
+    of an mmap are released once their block is done, so walking a mapped
+    file keeps only about one block resident.
+    """
+    if block_size < 4:
+        raise ValueError("block_size must be at least 4 bytes")
+    release = isinstance(data, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED")
+    size = len(data)
+    cuts = range(size - block_size, 0, -block_size) if backwards else range(block_size, size, block_size)
+    previous = size if backwards else 0
+    for cut in list(cuts) + [0 if backwards else size]:
+        # Continuation bytes belong to the character before them; a valid
+        # character has at most three, so never move further than that
+        for _ in range(3):
+            if 0 < cut < size and data[cut] & 0xC0 == 0x80:
+                cut += 1
+        start, end = (cut, previous) if backwards else (previous, cut)
+        if start < end:
+            yield start, end
+            if release:
+                low = start - start % mmap.PAGESIZE
+                data.madvise(mmap.MADV_DONTNEED, low, end - low)
+        previous = cut
+
+def word_spans(data, start=0, end=None):
+    """Yield the (start, end) offsets of the words in data[start:end].
+
+    start and end must lie on character boundaries. A word running past
+    either of them is reported cut at it.
+    """
+    for match in WORD_MARKS.finditer(word_marks(data[start:end])):
+        yield start + match.start(), start + match.end()
+
+def words_backwards(data, block_size=BLOCK_SIZE):
+    """Yield (start, end, words) for each block of a UTF-8 buffer, from the end to the start.
+
+    words holds the block's words as bytes, in text order, whole words only:
+    a word cut by the start of a block is held back and given with the block
+    before it. Splitting the blanked block with bytes.split() yields the
+    original words, since blanking only rewrites whitespace, at C speed;
+    taking them one word_spans match at a time costs about a microsecond
+    per word.
+    """
+    carry = b""
+    for start, end in blocks(data, block_size, backwards=True):
+        chunk = blank_whitespace(data[start:end]) + carry
+        words = chunk.split()
+        carry = words.pop(0) if start and words and not chunk[:1].isspace() else b""
+        yield start, end, words
+
+def reversed_words(data, block_size=BLOCK_SIZE):
+    """Yield the words of a UTF-8 buffer in reverse order as blocks of bytes, separated by single spaces.
+
+    This is reverse_word_order on the decoded text, encoded again, but only
+    one block of the buffer is looked at at a time.
+    """
+    separator = b""
+    for _, _, words in words_backwards(data, block_size):
+        if words:
+            words.reverse()
+            yield separator + b" ".join(words)
+            separator = b" "
+
+def scan_words(data, output=None, block_size=BLOCK_SIZE):
+    """Count the words, lines and bytes of a UTF-8 buffer, writing its words in reverse order to output if given.
+
+    Everything comes from one pass of the tokenizer, so a job that needs both
+    counts and reversed text reads and splits the input only once. Returns a
+    WordStats.
+    """
+    words = lines = word_bytes = longest = 0
+    for start, end, block_words in words_backwards(data, block_size):
+        lines += data[start:end].count(b"\n")
+        if not block_words:
+            continue
+        lengths = list(map(len, block_words))
+        word_bytes += sum(lengths)
+        longest = max(longest, max(lengths))
+        if output is not None:
+            block_words.reverse()
+            output.write((b" " if words else b"") + b" ".join(block_words))
+        words += len(block_words)
+    return WordStats(words, lines, len(data), word_bytes, longest)